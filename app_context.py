@@ -8,6 +8,8 @@ if TYPE_CHECKING:
     from services.database import DatabaseService
     from services.apscheduler import APSchedulerService
     from services.s3 import S3Service
+    from services.spoiler_index import SpoilerIndexService
+    from services.upload_queue import SpoilerUploadQueue
 
 # Global instances of services, this lets us access them anywhere in the application
 avianart_service: "AvianartService" = None
@@ -16,6 +18,8 @@ discord_service: "DiscordService" = None
 database_service: "DatabaseService" = None
 scheduler_service: "APSchedulerService" = None
 s3_service: "S3Service" = None
+spoiler_index_service: "SpoilerIndexService" = None
+spoiler_upload_queue: "SpoilerUploadQueue" = None
 
 
 def set_services(
@@ -25,15 +29,19 @@ def set_services(
     database: "DatabaseService",
     scheduler: "APSchedulerService",
     s3: "S3Service",
+    spoiler_index: "SpoilerIndexService" = None,
+    spoiler_uploads: "SpoilerUploadQueue" = None,
 ):
     """
     Sets the global service instances.
     This function should be called once at the start of the application.
     """
-    global avianart_service, racetime_service, discord_service, database_service, scheduler_service, s3_service
+    global avianart_service, racetime_service, discord_service, database_service, scheduler_service, s3_service, spoiler_index_service, spoiler_upload_queue
     avianart_service = avianart
     racetime_service = racetime
     discord_service = discord
     database_service = database
     scheduler_service = scheduler
     s3_service = s3
+    spoiler_index_service = spoiler_index
+    spoiler_upload_queue = spoiler_uploads
@@ -0,0 +1,102 @@
+"""
+Compare permalink fetch latency: one-shot blocking requests vs the pooled aiohttp client.
+
+    python -m benchmarks.avianart_latency [--requests 20] [--latency 0.02] [--connect-latency 0.03]
+
+Runs against benchmarks.avianart_stub. For each client it reports mean and p95
+request time, connections opened on the stub and the worst event loop lag seen
+while the requests were in flight. The blocking client is called on the event loop
+the way AvianartService used to call requests.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from types import SimpleNamespace
+
+import app_context as ac
+from benchmarks.avianart_stub import AvianartStub
+from services.avianart import AvianartService
+
+
+async def _ticker(stop: asyncio.Event, interval: float = 0.005) -> float:
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - start - interval)
+    return worst
+
+
+async def _measure(stub: AvianartStub, fetch, count: int) -> dict[str, float]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop))
+    await asyncio.sleep(0.02)
+    connections = stub.connections
+    times = []
+    for i in range(count):
+        start = time.perf_counter()
+        await fetch(f"seed{i}")
+        times.append(time.perf_counter() - start)
+    stop.set()
+    times.sort()
+    return {
+        "mean_ms": statistics.mean(times) * 1000,
+        "p95_ms": times[max(0, int(len(times) * 0.95) - 1)] * 1000,
+        "connections": stub.connections - connections,
+        "loop_lag_ms": await ticker * 1000,
+    }
+
+
+async def run(count: int, latency: float, connect_latency: float) -> int:
+    stub = AvianartStub(latency=latency, connect_latency=connect_latency).start()
+    ac.discord_service = SimpleNamespace()  # only touched on failures
+
+    import requests
+
+    async def blocking_fetch(seed_hash: str):
+        response = requests.get(
+            f"{stub.url}?action=permlink&hash={seed_hash}",
+            headers={"Authorization": "bench"},
+        )
+        return response.json()
+
+    service = AvianartService(stub.url, "bench")
+
+    results = {
+        "requests (blocking, new connection)": await _measure(stub, blocking_fetch, count),
+        "AvianartService (pooled aiohttp)": await _measure(stub, service.fetch_permalink, count),
+    }
+    await service.close()
+    stub.shutdown()
+
+    print(f"{count} permalink fetches, {len(stub.permalink_body('x')) / 1024 / 1024:.1f} MB each")
+    for name, result in results.items():
+        print(
+            f"  {name:<38} mean {result['mean_ms']:>7.1f} ms  p95 {result['p95_ms']:>7.1f} ms"
+            f"  connections {result['connections']:>3}  worst loop lag {result['loop_lag_ms']:>7.1f} ms"
+        )
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub delay per request, seconds")
+    parser.add_argument(
+        "--connect-latency",
+        type=float,
+        default=0.03,
+        help="stub delay per new connection, standing in for a TLS handshake",
+    )
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args.requests, args.latency, args.connect_latency))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
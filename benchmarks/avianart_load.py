@@ -0,0 +1,166 @@
+"""
+Load test seed rolls through AvianartService against the local AVIANART stand-in.
+
+    python -m benchmarks.avianart_load [--rolls 12] [--presets open,mmmmladder]
+        [--stagger 0.5] [--deadline 30] [--gen-time lognormal:6,0.5] [--fail-rate 0.05]
+        [--stuck-rate 0.05] [--error-rate 0.01] [--spoiler]
+
+Starts benchmarks.avianart_stub with the given generation time distributions and
+faults, then rolls seeds the way roll_seed does: generate_seed with a deadline,
+cycling through the presets and starting a roll every stagger seconds. With --spoiler
+each seed's spoiler is also converted, as for spoiler races (nothing is uploaded).
+
+Reports the end-to-end roll latency (queueing for a generation slot included), how
+the rolls ended, admin alerts sent, and the requests each roll cost: per action as
+seen by the stub, and POST plus permalink polls per generation from the telemetry
+AvianartService records.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import sys
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+import app_context as ac
+from benchmarks.avianart_stub import add_stub_arguments, stub_from_args
+from services.avianart import AvianartService
+from utils.generation_utils import percentile
+
+
+async def _roll(
+    service: AvianartService,
+    preset: str,
+    delay: float,
+    deadline: float,
+    spoiler: bool,
+) -> tuple[str, float]:
+    await asyncio.sleep(delay)
+    start = time.perf_counter()
+    try:
+        seed = await service.generate_seed(
+            preset,
+            True,
+            spoiler=spoiler,
+            deadline=datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=deadline),
+        )
+    except Exception:
+        return "exception", time.perf_counter() - start
+    if seed is None:
+        return "no seed", time.perf_counter() - start
+    if spoiler:
+        from utils import spoiler_utils
+
+        await spoiler_utils.prepare_spoiler(seed)
+    elif not seed.response.has_patch:
+        return "no patch", time.perf_counter() - start
+    return "seed", time.perf_counter() - start
+
+
+def _latencies(name: str, times: list[float]) -> str:
+    if not times:
+        return f"  {name:<16} -"
+    times = sorted(times)
+    return (
+        f"  {name:<16} p50 {percentile(times, 50):>6.2f} s  p95 {percentile(times, 95):>6.2f} s"
+        f"  max {times[-1]:>6.2f} s"
+    )
+
+
+async def run(args: argparse.Namespace) -> int:
+    alerts = []
+    generations = []
+
+    async def send_message(content=None, **kwargs):
+        alerts.append(content)
+
+    ac.database_service = SimpleNamespace(
+        get_setting=lambda key: None, add_seed_generation=generations.append
+    )
+    ac.discord_service = SimpleNamespace(send_message=send_message)
+
+    stub = stub_from_args(args).start()
+    service = AvianartService(
+        stub.url,
+        "load",
+        max_generations=args.max_generations,
+        requests_per_second=args.requests_per_second,
+        request_burst=args.request_burst,
+    )
+    presets = args.presets.split(",")
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(
+            _roll(service, presets[i % len(presets)], i * args.stagger, args.deadline, args.spoiler)
+            for i in range(args.rolls)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    await service.close()
+    stub.shutdown()
+
+    outcomes = Counter(outcome for outcome, _ in results)
+    print(
+        f"{args.rolls} rolls of {args.presets} in {elapsed:.1f} s, deadline {args.deadline:g} s,"
+        f" {args.max_generations} generation slots, {args.requests_per_second:g} requests/s"
+    )
+    print(
+        f"generation time {args.gen_time}, fail {args.fail_rate:g}, stuck {args.stuck_rate:g},"
+        f" HTTP 503 {args.error_rate:g}, dropped {args.drop_rate:g}"
+    )
+    print("roll latency")
+    print(_latencies("all rolls", [t for _, t in results]))
+    print(_latencies("with a seed", [t for outcome, t in results if outcome == "seed"]))
+    print("roll outcomes  " + "  ".join(f"{k} {v}" for k, v in sorted(outcomes.items())))
+    generation_outcomes = Counter(g.outcome for g in generations)
+    print("generations    " + "  ".join(f"{k} {v}" for k, v in sorted(generation_outcomes.items())))
+    print(f"admin alerts   {len(alerts)}")
+
+    total = sum(stub.requests.values())
+    print(
+        f"requests per roll {total / args.rolls:.1f}  ("
+        + ", ".join(f"{action} {count / args.rolls:.1f}" for action, count in sorted(stub.requests.items()))
+        + f"; faults injected {dict(stub.faults) or 0})"
+    )
+    if generations:
+        polls = sorted(1 + g.polls for g in generations)
+        print(
+            f"requests per generation  mean {sum(polls) / len(polls):.1f}"
+            f"  p95 {percentile(polls, 95)}  max {polls[-1]}"
+        )
+
+    # Every roll has to end by its deadline, plus a poll's worth of slack
+    late = [t for _, t in results if t > args.deadline + 2]
+    if late and not args.spoiler:
+        print(f"{len(late)} rolls overran the deadline")
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rolls", type=int, default=12)
+    parser.add_argument(
+        "--presets",
+        default="open,mmmmladder",
+        help="comma separated presets to roll in turn, mmmmladder rolls a mystery seed",
+    )
+    parser.add_argument("--stagger", type=float, default=0.5, help="seconds between roll starts")
+    parser.add_argument("--deadline", type=float, default=30.0, help="seconds each roll has for its seed")
+    parser.add_argument("--spoiler", action="store_true", help="convert each seed's spoiler too")
+    parser.add_argument("--max-generations", type=int, default=3)
+    parser.add_argument("--requests-per-second", type=float, default=2.0)
+    parser.add_argument("--request-burst", type=int, default=5)
+    add_stub_arguments(parser)
+    parser.set_defaults(gen_time="lognormal:6,0.5", latency=0.02)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
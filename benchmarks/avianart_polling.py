@@ -0,0 +1,137 @@
+"""
+Compare fixed 5 second permalink polling with the adaptive schedule in AvianartService.
+
+    python -m benchmarks.avianart_polling [--gen-times 3,12] [--seeds 3]
+
+Runs against benchmarks.avianart_stub with simulated generation phases. For each
+generation time, seeds are rolled one after another so the adaptive client can learn
+the preset's generation time; it reports the mean time until the seed was returned and
+the mean number of permalink polls per seed. Final runs check that a deadline stops
+a generation that takes too long, and that a stalled permalink request does not hold
+up polling for the other generations.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import datetime
+import sys
+import time
+from types import SimpleNamespace
+
+import app_context as ac
+from benchmarks.avianart_stub import AvianartStub
+from services.avianart import AvianartService
+
+
+class FixedIntervalService(AvianartService):
+    """The polling behaviour generate_seed had before it was made adaptive."""
+
+    def _poll_interval(self, phase, elapsed, expected, polls_in_phase) -> float:
+        return 5.0
+
+
+async def _roll(service_cls, gen_time: float, seeds: int) -> tuple[float, float]:
+    stub = AvianartStub(gen_time=gen_time).start()
+    service = service_cls(stub.url, "bench")
+    times = []
+    for _ in range(seeds):
+        start = time.perf_counter()
+        seed = await service.generate_seed("bench", True)
+        assert seed is not None and seed.response.patch
+        times.append(time.perf_counter() - start)
+    await service.close()
+    stub.shutdown()
+    return sum(times) / seeds, stub.polls / seeds
+
+
+async def _check_deadline() -> bool:
+    stub = AvianartStub(gen_time=60).start()
+    service = AvianartService(stub.url, "bench")
+    start = time.perf_counter()
+    seed = await service.generate_seed(
+        "bench",
+        True,
+        deadline=datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=3),
+    )
+    elapsed = time.perf_counter() - start
+    await service.close()
+    stub.shutdown()
+    ok = seed is None and elapsed < 4
+    print(f"deadline 3 s on a 60 s generation: gave up after {elapsed:.1f} s{'' if ok else '  FAILED'}")
+    return ok
+
+
+class StalledPollService(AvianartService):
+    """The first permalink request hangs, as one would on a slow connection."""
+
+    stalled = None
+
+    async def fetch_permalink(self, seed_hash: str):
+        if self.stalled is None:
+            self.stalled = seed_hash
+            await asyncio.sleep(30)
+        return await super().fetch_permalink(seed_hash)
+
+
+async def _check_stalled_poll() -> bool:
+    stub = AvianartStub(gen_time=2).start()
+    service = StalledPollService(stub.url, "bench")
+    deadline = datetime.datetime.now(datetime.UTC) + datetime.timedelta(seconds=8)
+    start = time.perf_counter()
+
+    async def roll() -> float | None:
+        seed = await service.generate_seed("bench", True, deadline=deadline)
+        return time.perf_counter() - start if seed is not None else None
+
+    times = await asyncio.gather(roll(), roll())
+    await service.close()
+    stub.shutdown()
+    done = [t for t in times if t is not None]
+    ok = len(done) == 1 and done[0] < 6
+    shown = f"{done[0]:.1f} s" if done else "never"
+    print(f"one permalink request stalled for 30 s: other seed after {shown}{'' if ok else '  FAILED'}")
+    return ok
+
+
+async def run(gen_times: list[float], seeds: int) -> int:
+    alerts = []
+
+    async def send_message(content=None, **kwargs):
+        alerts.append(content)
+
+    ac.database_service = SimpleNamespace(
+        get_setting=lambda key: None, add_seed_generation=lambda generation: None
+    )
+    ac.discord_service = SimpleNamespace(send_message=send_message)
+
+    for gen_time in gen_times:
+        print(f"generation time {gen_time:g} s, {seeds} seeds")
+        for name, service_cls in (
+            ("fixed 5 s interval", FixedIntervalService),
+            ("adaptive", AvianartService),
+        ):
+            mean_time, mean_polls = await _roll(service_cls, gen_time, seeds)
+            print(f"  {name:<20} seed after {mean_time:>5.1f} s  {mean_polls:>5.1f} polls per seed")
+
+    ok = await _check_deadline() and len(alerts) == 1
+    ok = await _check_stalled_poll() and ok
+    return 0 if ok else 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--gen-times",
+        default="3,12",
+        help="comma separated simulated generation times, seconds",
+    )
+    parser.add_argument("--seeds", type=int, default=3, help="seeds rolled per generation time")
+    args = parser.parse_args(argv)
+    gen_times = [float(value) for value in args.gen_times.split(",")]
+    return asyncio.run(run(gen_times, args.seeds))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
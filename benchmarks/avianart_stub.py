@@ -0,0 +1,344 @@
+"""
+Local stand-in for the AVIANART API, for benchmarks and load tests.
+
+    python -m benchmarks.avianart_stub [--port 8765] [--gen-time lognormal:30,0.4]
+        [--preset-gen-time mmmmladder=uniform:60,120] [--fail-rate 0.05]
+        [--stuck-rate 0.01] [--error-rate 0.01] [--drop-rate 0.01] [--patch-chunks 4000]
+
+Serves POST ?action=generate / ?action=mystery and GET ?action=permlink&hash=...
+Permalinks return a finished seed with a synthetic spoiler and a realistically sized
+patch (patch_chunks and rom_size set its size). Each seed draws its generation time
+from gen_time, or from preset_gen_times for its preset, and until then reports the
+pregeneration, generating and postgen phases. Generation times are distributions:
+
+- a number of seconds, or fixed:SECONDS
+- uniform:LOW,HIGH
+- lognormal:MEDIAN,SIGMA
+- exp:MEAN
+
+Failures are injected per seed or per request: fail_rate seeds end with the failure
+status, stuck_rate seeds never finish, error_rate requests get an HTTP 503 and
+drop_rate requests have their connection closed without a response. Random draws use
+a seeded generator so runs are repeatable. connect_latency is paid once per new
+connection, to stand in for the TLS handshake a pooled client avoids.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from benchmarks.synthetic import make_patch, make_spoiler
+
+
+@dataclass(frozen=True)
+class GenTime:
+    """A distribution of generation times, in seconds."""
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: GenTime | str | float) -> GenTime:
+        if isinstance(spec, GenTime):
+            return spec
+        if isinstance(spec, (int, float)):
+            return cls("fixed", float(spec))
+        kind, _, params = spec.partition(":")
+        if not params:
+            return cls("fixed", float(kind))
+        values = [float(value) for value in params.split(",")]
+        expected = {"fixed": 1, "uniform": 2, "lognormal": 2, "exp": 1}
+        if kind not in expected or len(values) != expected[kind]:
+            raise ValueError(f"Bad generation time {spec!r}")
+        return cls(kind, *values)
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(self.a, self.b)
+        if self.kind == "lognormal":
+            return rng.lognormvariate(math.log(self.a), self.b) if self.a > 0 else 0.0
+        if self.kind == "exp":
+            return rng.expovariate(1 / self.a) if self.a > 0 else 0.0
+        return self.a
+
+    def __str__(self) -> str:
+        if self.kind == "fixed":
+            return f"{self.a:g}"
+        if self.kind in ("uniform", "lognormal"):
+            return f"{self.kind}:{self.a:g},{self.b:g}"
+        return f"{self.kind}:{self.a:g}"
+
+
+@dataclass
+class _Seed:
+    preset: str
+    started: float
+    gen_time: float
+    # success, failure or stuck
+    outcome: str = "success"
+    polls: int = 0
+
+
+class _AvianartHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+        time.sleep(self.server.connect_latency)
+
+    def _send_json(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _query(self) -> dict[str, str]:
+        return {k: v[0] for k, v in parse_qs(urlsplit(self.path).query).items()}
+
+    def _inject_fault(self, action: str) -> bool:
+        """Drop the connection or answer with an error instead of serving the request."""
+        fault = self.server.draw_fault(action)
+        if fault == "drop":
+            self.close_connection = True
+            return True
+        if fault == "error":
+            body = b"Service Unavailable"
+            self.send_response(503)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return True
+        return False
+
+    def do_POST(self):
+        time.sleep(self.server.latency)
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        query = self._query()
+        action = query.get("action")
+        if action not in ("generate", "mystery"):
+            self._send_json(400, b'{"status": 400, "response": {"message": "bad action"}}')
+            return
+        if self._inject_fault(action):
+            return
+        preset = query.get("preset", "") if action == "generate" else "mystery"
+        seed_hash = self.server.start_seed(preset)
+        body = {"status": 200, "response": {"hash": seed_hash, "message": "Generation started"}}
+        self._send_json(200, json.dumps(body).encode())
+
+    def do_GET(self):
+        time.sleep(self.server.latency)
+        query = self._query()
+        if query.get("action") != "permlink" or "hash" not in query:
+            self._send_json(400, b'{"status": 400, "response": {"message": "bad action"}}')
+            return
+        if self._inject_fault("permlink"):
+            return
+        seed_hash = query["hash"]
+        with self.server.lock:
+            self.server.polls += 1
+            seed = self.server.seeds.get(seed_hash)
+            if seed is not None:
+                seed.polls += 1
+        phase = self.server.phase(seed_hash)
+        if phase is not None:
+            message = "Generation failed" if phase == "failure" else "Seed generating"
+            body = {"status": 200, "response": {"hash": seed_hash, "message": message, "status": phase}}
+            self._send_json(200, json.dumps(body).encode())
+            return
+        self._send_json(200, self.server.permalink_body(seed_hash))
+
+
+class AvianartStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.0,
+        connect_latency: float = 0.0,
+        gen_time: GenTime | str | float = 0.0,
+        preset_gen_times: dict[str, GenTime | str | float] | None = None,
+        fail_rate: float = 0.0,
+        stuck_rate: float = 0.0,
+        error_rate: float = 0.0,
+        drop_rate: float = 0.0,
+        patch_chunks: int = 4000,
+        rom_size: int = 0x200000,
+        seed: int = 0,
+    ):
+        super().__init__(("127.0.0.1", port), _AvianartHandler)
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.gen_time = GenTime.parse(gen_time)
+        self.preset_gen_times = {
+            preset.lower(): GenTime.parse(spec) for preset, spec in (preset_gen_times or {}).items()
+        }
+        self.fail_rate = fail_rate
+        self.stuck_rate = stuck_rate
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.connections = 0
+        self.generated = 0
+        self.polls = 0
+        # Requests per action, and the requests that were failed on purpose
+        self.requests: Counter[str] = Counter()
+        self.faults: Counter[str] = Counter()
+        self.seeds: dict[str, _Seed] = {}
+        self.lock = threading.Lock()
+        self.rng = random.Random(seed)
+        # The payload is the same for every hash apart from the hash itself; build it once.
+        self._template = {
+            "status": 200,
+            "response": {
+                "hash": "{hash}",
+                "message": "Seed generated",
+                "status": None,
+                "spoiler": make_spoiler(seed=1, boss_shuffle=True),
+                "patch": make_patch(seed=1, rom_size=rom_size, chunks=patch_chunks),
+                "type": "dr",
+            },
+        }
+        self._body_parts = json.dumps(self._template).encode().split(b'"{hash}"', 1)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}/api.php"
+
+    def draw_fault(self, action: str) -> str | None:
+        """Count a request and decide whether it is dropped or errored."""
+        with self.lock:
+            self.requests[action] += 1
+            roll = self.rng.random()
+            if roll < self.drop_rate:
+                fault = "drop"
+            elif roll < self.drop_rate + self.error_rate:
+                fault = "error"
+            else:
+                return None
+            self.faults[fault] += 1
+            return fault
+
+    def start_seed(self, preset: str) -> str:
+        with self.lock:
+            self.generated += 1
+            seed_hash = hashlib.sha1(str(self.generated).encode()).hexdigest()[:10]
+            distribution = self.preset_gen_times.get(preset.lower(), self.gen_time)
+            roll = self.rng.random()
+            if roll < self.fail_rate:
+                outcome = "failure"
+            elif roll < self.fail_rate + self.stuck_rate:
+                outcome = "stuck"
+            else:
+                outcome = "success"
+            self.seeds[seed_hash] = _Seed(
+                preset=preset,
+                started=time.monotonic(),
+                gen_time=distribution.sample(self.rng),
+                outcome=outcome,
+            )
+        return seed_hash
+
+    def phase(self, seed_hash: str) -> str | None:
+        """Generation phase reported for a seed, or None once it is finished."""
+        seed = self.seeds.get(seed_hash)
+        if seed is None:
+            return None
+        progress = (time.monotonic() - seed.started) / seed.gen_time if seed.gen_time else 1.0
+        if seed.outcome == "stuck":
+            progress = min(progress, 0.5)
+        if progress >= 1:
+            return "failure" if seed.outcome == "failure" else None
+        if progress < 0.15:
+            return "pregeneration"
+        if progress < 0.9:
+            return "generating"
+        return "postgen"
+
+    def permalink_body(self, seed_hash: str) -> bytes:
+        return self._body_parts[0] + json.dumps(seed_hash).encode() + self._body_parts[1]
+
+    def start(self) -> "AvianartStub":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+def preset_gen_time(value: str) -> tuple[str, GenTime]:
+    """argparse type for PRESET=SPEC."""
+    preset, sep, spec = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected PRESET=SPEC, got {value!r}")
+    try:
+        return preset, GenTime.parse(spec)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser):
+    """The stub's options, shared with the load test driver."""
+    parser.add_argument("--latency", type=float, default=0.0, help="delay per request, seconds")
+    parser.add_argument("--connect-latency", type=float, default=0.0, help="delay per new connection, seconds")
+    parser.add_argument(
+        "--gen-time", type=GenTime.parse, default=GenTime(), help="generation time distribution"
+    )
+    parser.add_argument(
+        "--preset-gen-time",
+        type=preset_gen_time,
+        action="append",
+        default=[],
+        metavar="PRESET=SPEC",
+        help="generation time distribution for one preset, mystery seeds use 'mystery'",
+    )
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="share of seeds that fail")
+    parser.add_argument("--stuck-rate", type=float, default=0.0, help="share of seeds that never finish")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with HTTP 503")
+    parser.add_argument("--drop-rate", type=float, default=0.0, help="share of requests whose connection is dropped")
+    parser.add_argument("--patch-chunks", type=int, default=4000, help="patch size, in chunks of up to 512 bytes")
+    parser.add_argument("--seed", type=int, default=0, help="random seed for generation times and faults")
+
+
+def stub_from_args(args: argparse.Namespace, port: int = 0) -> AvianartStub:
+    return AvianartStub(
+        port=port,
+        latency=args.latency,
+        connect_latency=args.connect_latency,
+        gen_time=args.gen_time,
+        preset_gen_times=dict(args.preset_gen_time),
+        fail_rate=args.fail_rate,
+        stuck_rate=args.stuck_rate,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        patch_chunks=args.patch_chunks,
+        seed=args.seed,
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--port", type=int, default=8765)
+    add_stub_arguments(parser)
+    args = parser.parse_args(argv)
+    stub = stub_from_args(args, args.port)
+    print(f"Serving AVIANART stub at {stub.url}")
+    stub.serve_forever()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,95 @@
+"""
+Report per-module import cost for a cold start of the bot.
+
+    python -m benchmarks.import_report [MODULE] [--top N] [--first-party]
+
+Imports MODULE (default: main) in a fresh interpreter under ``-X importtime`` and
+prints the most expensive modules by cumulative and self time. The report covers
+everything imported before a failure, so it is still useful when an optional
+dependency is missing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$")
+
+
+@dataclass
+class ModuleImport:
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def _is_first_party(name: str) -> bool:
+    top = name.split(".")[0]
+    return (REPO_ROOT / f"{top}.py").exists() or (REPO_ROOT / top).is_dir()
+
+
+def measure(module: str) -> tuple[list[ModuleImport], str | None]:
+    """Import module in a subprocess; returns the timings and the error, if any."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+    )
+    imports = []
+    other_lines = []
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append(
+                ModuleImport(name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2)
+            )
+        elif not line.startswith("import time:"):
+            other_lines.append(line)
+    error = None
+    if proc.returncode != 0:
+        error = other_lines[-1] if other_lines else f"exit code {proc.returncode}"
+    return imports, error
+
+
+def _table(title: str, rows: list[ModuleImport], key: str, top: int) -> None:
+    print(f"\n{title}")
+    for row in sorted(rows, key=lambda r: getattr(r, key), reverse=True)[:top]:
+        print(
+            f"  {row.cumulative_us / 1000:>8.1f} ms cumulative"
+            f"  {row.self_us / 1000:>7.1f} ms self  {row.name}"
+        )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("module", nargs="?", default="main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument(
+        "--first-party", action="store_true", help="only list modules from this repository"
+    )
+    args = parser.parse_args(argv)
+
+    imports, error = measure(args.module)
+    rows = [i for i in imports if _is_first_party(i.name)] if args.first_party else imports
+    total = sum(i.cumulative_us for i in imports if i.depth == 0)
+
+    print(f"import {args.module}: {total / 1000:.1f} ms over {len(imports)} modules")
+    if error:
+        print(f"  import failed: {error}")
+    _table("By cumulative time", rows, "cumulative_us", args.top)
+    _table("By self time", rows, "self_us", args.top)
+    return 1 if error else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
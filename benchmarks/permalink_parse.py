@@ -0,0 +1,131 @@
+"""
+Compare eager and lazy parsing of AVIANART permalink bodies.
+
+    python -m benchmarks.permalink_parse [--repeat 20]
+
+Uses the finished-seed body served by benchmarks.avianart_stub. For each way of
+reading it, reports the mean parse time and the peak Python allocation (tracemalloc)
+while parsing:
+
+- eager: json.loads of the whole body, as fetch_permalink used to do
+- lazy: spans only, with status and has_patch checked the way a poll does
+- lazy + spoiler / lazy + patch and spoiler: the members a roll actually decodes
+- mmap: the lazy path over a memory-mapped spool file instead of bytes
+
+Lazily decoded members are checked against the eager result. Exits non-zero on a
+mismatch.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.avianart_stub import AvianartStub
+from services.avianart import AvianartGenPayload, AvianResponsePayload, json_member_spans
+
+
+def _eager(raw) -> AvianartGenPayload:
+    data = json.loads(raw)
+    return AvianartGenPayload(status=data["status"], response=AvianResponsePayload(**data["response"]))
+
+
+def _lazy(raw) -> AvianartGenPayload:
+    spans = json_member_spans(raw, expand="response")
+    start, end = spans["status"]
+    return AvianartGenPayload(
+        status=json.loads(raw[start:end]),
+        response=AvianResponsePayload.from_raw(raw, spans["response"]),
+    )
+
+
+def _poll(raw):
+    payload = _lazy(raw)
+    return payload.response.status, payload.response.has_patch
+
+
+def _spoiler(raw):
+    return _lazy(raw).response.spoiler
+
+
+def _full(raw):
+    response = _lazy(raw).response
+    return response.spoiler, response.patch
+
+
+def _measure(fn, make_raw, repeat: int) -> tuple[float, float]:
+    times = []
+    for _ in range(repeat):
+        raw = make_raw()
+        start = time.perf_counter()
+        fn(raw)
+        times.append(time.perf_counter() - start)
+    raw = make_raw()
+    tracemalloc.start()
+    result = fn(raw)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return statistics.mean(times) * 1000, peak / 1024 / 1024
+
+
+def run(repeat: int) -> int:
+    stub = AvianartStub()
+    stub.server_close()
+    body = stub.permalink_body("benchhash1")
+
+    spool = tempfile.TemporaryFile()
+    spool.write(body)
+    spool.flush()
+
+    def mapped():
+        return mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+
+    eager = _eager(body).response
+    lazy = _lazy(body).response
+    ok = (
+        lazy.status == eager.status
+        and lazy.hash == eager.hash
+        and lazy.has_patch
+        and lazy.spoiler == eager.spoiler
+        and lazy.patch == eager.patch
+        and lazy.raw is None
+    )
+    mapped_response = _lazy(mapped()).response
+    ok = ok and mapped_response.patch == eager.patch and mapped_response.spoiler == eager.spoiler
+
+    print(f"finished permalink body: {len(body) / 1024 / 1024:.1f} MB")
+    cases = [
+        ("eager (json.loads)", _eager, lambda: body),
+        ("lazy, poll (status + has_patch)", _poll, lambda: body),
+        ("lazy + spoiler", _spoiler, lambda: body),
+        ("lazy + spoiler + patch", _full, lambda: body),
+        ("mmap, poll (status + has_patch)", _poll, mapped),
+        ("mmap + spoiler + patch", _full, mapped),
+    ]
+    for name, fn, make_raw in cases:
+        mean_ms, peak_mb = _measure(fn, make_raw, repeat)
+        print(f"  {name:<34} {mean_ms:>8.2f} ms  peak alloc {peak_mb:>7.2f} MB")
+
+    spool.close()
+    if not ok:
+        print("lazily decoded payload does not match json.loads")
+        return 1
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args(argv)
+    return run(args.repeat)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,194 @@
+"""
+Check that S3 uploads do not block the event loop.
+
+    python -m benchmarks.s3_event_loop [--size-mb 32] [--latency 0.05] [--max-lag-ms 50]
+
+Starts a local S3 stand-in (single PUT, HEAD and multipart uploads, with artificial
+latency on every request) and uploads through S3Service while a ticker task measures
+how late the event loop wakes up. The same upload is then made by calling boto3
+directly on the loop for comparison. Exits non-zero if the loop lag during the
+S3Service uploads exceeds --max-lag-ms.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from services.s3 import MB, S3Service
+
+
+class _S3StandIn(BaseHTTPRequestHandler):
+    """Just enough of the S3 REST API for boto3 uploads. Objects live in server.objects."""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _read_body(self) -> bytes:
+        if "Content-Length" in self.headers:
+            return self.rfile.read(int(self.headers["Content-Length"]))
+        if self.headers.get("Transfer-Encoding", "").lower() == "chunked":
+            body = bytearray()
+            while True:
+                size = int(self.rfile.readline().split(b";")[0].strip(), 16)
+                if size == 0:
+                    # Trailers, then the blank line ending the request.
+                    while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                        pass
+                    return bytes(body)
+                body += self.rfile.read(size)
+                self.rfile.readline()
+        return b""
+
+    def _respond(self, status: int, body: bytes = b"", headers: dict | None = None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body and self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _request(self):
+        time.sleep(self.server.latency)
+        url = urlsplit(self.path)
+        return url.path, parse_qs(url.query, keep_blank_values=True)
+
+    def do_HEAD(self):
+        key, _ = self._request()
+        data = self.server.objects.get(key)
+        if data is None:
+            self._respond(404)
+        else:
+            self._respond(200, headers={"ETag": f'"{hashlib.md5(data).hexdigest()}"'})
+
+    def do_PUT(self):
+        key, query = self._request()
+        data = self._read_body()
+        etag = f'"{hashlib.md5(data).hexdigest()}"'
+        if "partNumber" in query:
+            upload = self.server.uploads[query["uploadId"][0]]
+            upload[int(query["partNumber"][0])] = data
+        else:
+            self.server.objects[key] = data
+        self._respond(200, headers={"ETag": etag})
+
+    def do_POST(self):
+        key, query = self._request()
+        self._read_body()
+        bucket, _, name = key.lstrip("/").partition("/")
+        if "uploads" in query:
+            upload_id = hashlib.sha1(f"{key}{time.time()}".encode()).hexdigest()
+            self.server.uploads[upload_id] = {}
+            body = (
+                "<InitiateMultipartUploadResult>"
+                f"<Bucket>{bucket}</Bucket><Key>{name}</Key><UploadId>{upload_id}</UploadId>"
+                "</InitiateMultipartUploadResult>"
+            )
+        else:
+            parts = self.server.uploads.pop(query["uploadId"][0])
+            self.server.objects[key] = b"".join(parts[n] for n in sorted(parts))
+            body = (
+                "<CompleteMultipartUploadResult>"
+                f"<Bucket>{bucket}</Bucket><Key>{name}</Key><ETag>\"{len(parts)}\"</ETag>"
+                "</CompleteMultipartUploadResult>"
+            )
+        self._respond(200, body.encode(), {"Content-Type": "application/xml"})
+
+
+def start_stand_in(latency: float) -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _S3StandIn)
+    server.daemon_threads = True
+    server.latency = latency
+    server.objects = {}
+    server.uploads = {}
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+async def _ticker(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Worst delay past a requested wake-up, in seconds."""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        worst = max(worst, loop.time() - start - interval)
+    return worst
+
+
+async def _measure(upload) -> tuple[object, float, float]:
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_ticker(stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    result = await upload()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return result, elapsed, await ticker
+
+
+async def run(size_mb: int, latency: float, max_lag_ms: float) -> int:
+    os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+    server = start_stand_in(latency)
+    s3 = S3Service(
+        endpoint_url=f"http://127.0.0.1:{server.server_port}",
+        access_key="bench",
+        secret_key="bench",
+        bucket_name="bench",
+    )
+    small = os.urandom(200 * 1024)
+    large = os.urandom(size_mb * MB)
+
+    async def blocking():
+        return s3._upload_bytes(large, "blocking.bin")
+
+    cases = [
+        ("spoiler-sized, S3Service", lambda: s3.upload_bytes(small, "small.json"), True),
+        (f"{size_mb} MB multipart, S3Service", lambda: s3.upload_bytes(large, "large.bin"), True),
+        ("HEAD, S3Service", lambda: s3.get_object_etag("large.bin"), True),
+        (f"{size_mb} MB, blocking call on the loop", blocking, False),
+    ]
+
+    failed = False
+    for name, upload, checked in cases:
+        result, elapsed, lag = await _measure(upload)
+        status = ""
+        if checked and lag * 1000 > max_lag_ms:
+            status = "  LOOP BLOCKED"
+            failed = True
+        if not result:
+            status += "  FAILED"
+            failed = failed or checked
+        print(f"{name:<36} {elapsed * 1000:>8.1f} ms  worst loop lag {lag * 1000:>7.1f} ms{status}")
+
+    stored = len(server.objects.get("/bench/large.bin", b""))
+    if stored != len(large):
+        print(f"multipart object is {stored} bytes, expected {len(large)}")
+        failed = True
+
+    s3.shutdown()
+    server.shutdown()
+    return 1 if failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--size-mb", type=int, default=32, help="large object size, above the multipart threshold")
+    parser.add_argument("--latency", type=float, default=0.05, help="stand-in delay per request, seconds")
+    parser.add_argument("--max-lag-ms", type=float, default=50.0)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args.size_mb, args.latency, args.max_lag_ms))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,262 @@
+"""
+Benchmark the spoiler pipeline on synthetic seeds.
+
+    python -m benchmarks.spoiler_bench [--variant NAME] [--repeat N]
+                                       [--save-baseline] [--tolerance 0.25]
+
+Reports the median time of each stage and the peak traced memory of a full
+pipeline run. Stage timings are compared against benchmarks/baselines.json when it
+exists; baselines are machine-specific, so save them on the host you compare on.
+
+Every variant is also converted with benchmarks/reference_converter.py, a verbatim
+copy of the converter before it was optimised, and the output files are compared
+byte for byte. Any difference fails the run, as does a PatchImage read that
+disagrees with the linear scan of find_jsonrom_byte.
+
+Stages:
+    load        json.loads of the raw spoiler
+    extra_info  spoiler_utils.add_extra_info_to_spoiler on a realistic patch
+    renames     _apply_location_renames over every raw key, cold memo
+    owner_scan  dungeon owner of every raw key, scanning the dungeon sections per
+                key as the reference converter's _dungeon_owner does
+    owner_index the same through _build_dungeon_owner_index, index build included
+    locations   _emit_locations, warm rename memo
+    entrances   _emit_entrances
+    dump        spoiler_converter.dumps
+    transform   spoiler_converter.transform_data end to end, cold memo
+    reference   reference_converter.transform end to end, file to file
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+
+import spoiler_converter
+from benchmarks import reference_converter
+from benchmarks.synthetic import VARIANTS, make_patch, make_spoiler
+
+BASELINES_PATH = Path(__file__).parent / "baselines.json"
+# The reference copy is kept verbatim, point it at the repo's data directory.
+reference_converter._TEMPLATES_PATH = (
+    Path(spoiler_converter.__file__).parent / "data" / "spoiler_orders.json"
+)
+
+
+def _median_time(fn: Callable[[], object], repeat: int, setup: Callable[[], None] | None = None) -> float:
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _payload(raw: bytes, patch: dict) -> SimpleNamespace:
+    """Stand-in for AvianartGenPayload with only the fields spoiler_utils reads."""
+    return SimpleNamespace(response=SimpleNamespace(spoiler=json.loads(raw), patch=patch))
+
+
+def check_parity(raw: bytes) -> bool:
+    """Convert a raw spoiler with the reference and current converters, compare bytes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "spoiler.json"
+        source.write_bytes(raw)
+        reference_converter.transform(source, Path(tmp) / "reference.json")
+        spoiler_converter.transform(source, Path(tmp) / "current.json")
+        return (Path(tmp) / "reference.json").read_bytes() == (
+            Path(tmp) / "current.json"
+        ).read_bytes()
+
+
+def check_patch_image(reads: int = 500) -> list[str]:
+    """Compare PatchImage byte, read and read_many with a linear scan of the patch."""
+    from utils.spoiler_utils import PatchImage, find_jsonrom_byte
+
+    # Hand-picked edge cases, then random ranges over a small synthetic patch.
+    cases = [
+        ({"10": [1, 2, 3]}, 12, 3),
+        ({"10": [1, 2, 3], "20": [4, 5]}, 8, 16),
+        ({"10": [1, 2, 3], "20": [4, 5]}, 0, 5),
+        ({"10": [1, 2, 3], "13": [4, 5]}, 11, 4),
+        ({}, 0, 4),
+    ]
+    rng = random.Random(2)
+    patch = make_patch(seed=2, rom_size=0x4000, chunks=100)
+    for _ in range(reads):
+        cases.append((patch, rng.randrange(0, 0x4100), rng.randrange(0, 64)))
+    cases.append((patch, 0x37A70, 80))
+
+    failures = []
+    images = {}
+    for data, address, length in cases:
+        image = images.setdefault(id(data), PatchImage(data))
+        addresses = list(range(address, address + length))
+        expected = [find_jsonrom_byte(data, a) for a in addresses]
+        if image.read(address, length) != expected:
+            failures.append(f"read({address:#x}, {length})")
+        if [image.byte(a) for a in addresses] != expected:
+            failures.append(f"byte over {address:#x}..{address + length:#x}")
+        if image.read_many(addresses) != dict(zip(addresses, expected)):
+            failures.append(f"read_many over {address:#x}..{address + length:#x}")
+    return failures
+
+
+def bench_variant(name: str, repeat: int) -> dict[str, float]:
+    # Imported here so the converter-only stages run without the bot config.
+    from utils import spoiler_utils
+
+    raw = json.dumps(make_spoiler(seed=1, **VARIANTS[name])).encode("utf-8")
+    patch = make_patch(seed=1)
+    data = json.loads(raw)
+    templates = spoiler_converter.get_template_index()
+    meta = data.get("meta", {})
+    boss_setting = spoiler_converter._first_setting(meta, "boss_shuffle")
+    boss_shuffle = bool(boss_setting and str(boss_setting).lower() != "none")
+    followers = set(spoiler_converter.FOLLOWER_DESTINATION_MAP)
+    raw_keys = [key for key, _ in spoiler_converter._gather_input_locations(data)]
+    clear_memo = spoiler_converter._apply_location_renames.cache_clear
+
+    def renames():
+        for key in raw_keys:
+            spoiler_converter._apply_location_renames(key)
+
+    def owner_scan():
+        return [reference_converter._dungeon_owner(data, key) for key in raw_keys]
+
+    def owner_index():
+        owners = spoiler_converter._build_dungeon_owner_index(data)
+        return [owners.get(key) for key in raw_keys]
+
+    if owner_scan() != owner_index():
+        raise AssertionError(f"{name}: dungeon owner index disagrees with the scan")
+
+    results = {
+        "load": _median_time(lambda: json.loads(raw), repeat),
+        "extra_info": _median_time(
+            lambda: spoiler_utils.add_extra_info_to_spoiler(_payload(raw, patch)), repeat
+        ),
+        "renames": _median_time(renames, repeat, setup=clear_memo),
+        "owner_scan": _median_time(owner_scan, repeat),
+        "owner_index": _median_time(owner_index, repeat),
+        "locations": _median_time(
+            lambda: spoiler_converter._emit_locations(
+                data, data.get("Bosses", {}), templates, followers, boss_shuffle
+            ),
+            repeat,
+        ),
+        "entrances": _median_time(
+            lambda: spoiler_converter._emit_entrances(
+                data, templates.category_order, templates.category_members
+            ),
+            repeat,
+        ),
+    }
+    out = spoiler_converter.transform_data(data)
+    results["dump"] = _median_time(lambda: spoiler_converter.dumps(out), repeat)
+    results["transform"] = _median_time(
+        lambda: spoiler_converter.transform_data(data), repeat, setup=clear_memo
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        source = Path(tmp) / "spoiler.json"
+        source.write_bytes(raw)
+        results["reference"] = _median_time(
+            lambda: reference_converter.transform(source, Path(tmp) / "out.json"), repeat
+        )
+
+    clear_memo()
+    tracemalloc.start()
+    payload = _payload(raw, patch)
+    spoiler_converter.dumps(
+        spoiler_converter.transform_data(spoiler_utils.add_extra_info_to_spoiler(payload))
+    )
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results["peak_mb"] = peak / (1024 * 1024)
+    return results
+
+
+def _compare(
+    name: str, results: dict[str, float], baselines: dict, tolerance: float
+) -> list[str]:
+    regressions = []
+    baseline = baselines.get(name, {})
+    print(f"\n{name}")
+    for stage, value in results.items():
+        unit = "MB" if stage == "peak_mb" else "ms"
+        shown = value if stage == "peak_mb" else value * 1000
+        line = f"  {stage:<11} {shown:>9.2f} {unit}"
+        if stage in baseline and baseline[stage]:
+            ratio = value / baseline[stage]
+            line += f"  ({ratio:.2f}x baseline)"
+            if ratio > 1 + tolerance:
+                line += "  REGRESSION"
+                regressions.append(f"{name}.{stage}")
+        print(line)
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--variant", choices=sorted(VARIANTS), action="append")
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="allowed slowdown over baseline before flagging (default 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    baselines = {}
+    if BASELINES_PATH.exists():
+        baselines = json.loads(BASELINES_PATH.read_text(encoding="utf-8"))
+
+    all_results = {}
+    regressions = []
+    mismatches = []
+    patch_failures = check_patch_image()
+    if patch_failures:
+        print(
+            f"PatchImage disagrees with the linear scan: {', '.join(patch_failures[:10])}",
+            file=sys.stderr,
+        )
+        return 1
+    for name in args.variant or list(VARIANTS):
+        raw = json.dumps(make_spoiler(seed=1, **VARIANTS[name])).encode("utf-8")
+        if not check_parity(raw):
+            mismatches.append(name)
+        all_results[name] = bench_variant(name, args.repeat)
+        regressions += _compare(name, all_results[name], baselines, args.tolerance)
+
+    if mismatches:
+        print(
+            f"\nOutput differs from the reference converter: {', '.join(mismatches)}",
+            file=sys.stderr,
+        )
+        return 1
+
+    if args.save_baseline:
+        baselines.update(all_results)
+        BASELINES_PATH.write_text(json.dumps(baselines, indent=4), encoding="utf-8")
+        print(f"\nSaved baselines to {BASELINES_PATH}")
+    elif regressions:
+        print(f"\nRegressions: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,196 @@
+"""
+Synthetic DR/OWR spoilers and jsonrom patches for benchmarking the spoiler pipeline.
+
+Locations and entrances come from data/spoiler_orders.json with the converter's
+rename tables applied in reverse, so the converter sees realistic raw keys.
+"""
+
+from __future__ import annotations
+
+import json
+import random
+from pathlib import Path
+
+from data.spoiler_data import (
+    BOSS_NAMES,
+    ENEMY_NAMES,
+    ENTRANCE_LOCATIONS_EXCLUDE_LIST,
+    ENTRANCE_NAME_REPLACEMENTS,
+    FOLLOWER_BRANCH_MAP,
+    FOLLOWER_DESTINATION_MAP,
+    ITEM_NAMES_CONVERTER,
+    LOCATION_NAME_REPLACEMENTS,
+    PRIZE_NAMES_CONVERTER,
+)
+
+_TEMPLATES_PATH = Path(__file__).parent.parent / "data" / "spoiler_orders.json"
+
+OUTPUT_TO_INPUT_DUNGEON = {
+    "Hyrule Castle": "Hyrule Castle",
+    "Eastern Palace": "Eastern Palace",
+    "Desert Palace": "Desert Palace",
+    "Tower Of Hera": "Tower of Hera",
+    "Castle Tower": "Agahnims Tower",
+    "Dark Palace": "Palace of Darkness",
+    "Swamp Palace": "Swamp Palace",
+    "Skull Woods": "Skull Woods",
+    "Thieves Town": "Thieves Town",
+    "Ice Palace": "Ice Palace",
+    "Misery Mire": "Misery Mire",
+    "Turtle Rock": "Turtle Rock",
+    "Ganons Tower": "Ganons Tower",
+}
+
+# name -> generator kwargs
+VARIANTS: dict[str, dict] = {
+    "vanilla": {},
+    "boss_shuffle": {"boss_shuffle": True},
+    "follower_shuffle": {"follower_shuffle": True},
+    "entrance_shuffle": {"entrance_shuffle": "crossed"},
+    "multiworld": {
+        "boss_shuffle": True,
+        "entrance_shuffle": "full",
+        "players": 4,
+    },
+}
+
+# The prize bytes spoiler_utils decodes from the patch.
+_PRIZE_BYTES = list(range(0xD8, 0xE4))
+
+_INVERSE_RENAMES = sorted(
+    ((new, old) for old, new in LOCATION_NAME_REPLACEMENTS.items() if old != new),
+    key=lambda kv: -len(kv[0]),
+)
+
+
+def _load_templates() -> dict:
+    with open(_TEMPLATES_PATH, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _raw_location_key(key: str) -> str:
+    """Undo one output rename, so the converter has real work to do."""
+    for new, old in _INVERSE_RENAMES:
+        if new in key:
+            return key.replace(new, old, 1)
+    return key
+
+
+def make_spoiler(
+    seed: int = 0,
+    boss_shuffle: bool = False,
+    follower_shuffle: bool = False,
+    entrance_shuffle: str = "vanilla",
+    players: int = 1,
+) -> dict:
+    """Build a raw spoiler dict in the shape AVIANART returns."""
+    rng = random.Random(seed)
+    templates = _load_templates()
+    items = list(ITEM_NAMES_CONVERTER)
+
+    def item() -> str:
+        value = rng.choice(items)
+        if players > 1:
+            value += f" (Player {rng.randint(1, players)})"
+        return value
+
+    data: dict = {"Light World": {}, "Dark World": {}, "Caves": {}}
+    for output_section, keys in templates["locations"].items():
+        for key in keys:
+            raw_key = _raw_location_key(key)
+            if "Enemy" in raw_key and rng.random() < 0.3:
+                raw_key += f" ({rng.choice(ENEMY_NAMES)})"
+            if output_section in OUTPUT_TO_INPUT_DUNGEON:
+                source = OUTPUT_TO_INPUT_DUNGEON[output_section]
+            elif output_section == "Dark World":
+                source = "Dark World"
+            else:
+                source = rng.choice(("Light World", "Caves"))
+            if raw_key.endswith(" - Prize"):
+                value = rng.choice(list(PRIZE_NAMES_CONVERTER))
+            else:
+                value = item()
+            data.setdefault(source, {})[raw_key] = value
+
+    data["Light World"]["Agahnim 1"] = "Beat Agahnim 1"
+    data["Dark World"]["Agahnim 2"] = "Beat Agahnim 2"
+    for destination in FOLLOWER_DESTINATION_MAP:
+        data["Light World"][destination] = (
+            rng.choice(list(FOLLOWER_BRANCH_MAP)) if follower_shuffle else destination
+        )
+
+    data["Bosses"] = {
+        dungeon: rng.choice(BOSS_NAMES) for dungeon in OUTPUT_TO_INPUT_DUNGEON.values()
+    }
+    for gt_room in ("Ganons Tower Basement", "Ganons Tower Middle", "Ganons Tower Top"):
+        data["Bosses"][gt_room] = rng.choice(BOSS_NAMES)
+
+    data["Special"] = {"Misery Mire": "Ether", "Turtle Rock": "Quake"}
+    data["Bottles"] = {
+        "Waterfall Bottle": rng.choice(items),
+        "Pyramid Bottle": rng.choice(items),
+    }
+
+    if entrance_shuffle != "vanilla":
+        exits = [key[: -len(" @")] for keys in templates["entrances"].values() for key in keys]
+        entrances = []
+        for exit_name in exits:
+            entrances.append(
+                {
+                    "entrance": rng.choice(exits),
+                    "exit": exit_name,
+                    "direction": rng.choice(("entrance", "exit", "both")),
+                }
+            )
+        for excluded in ENTRANCE_LOCATIONS_EXCLUDE_LIST:
+            entrances.append(
+                {"entrance": f"{excluded}Door", "exit": rng.choice(exits), "direction": "both"}
+            )
+        for renamed in ENTRANCE_NAME_REPLACEMENTS:
+            entrances.append(
+                {"entrance": rng.choice(exits), "exit": renamed, "direction": "both"}
+            )
+        data["Entrances"] = entrances
+
+    data["meta"] = {
+        "seed": rng.randint(0, 2**31),
+        "hash": ", ".join(rng.sample(["Bow", "Boomerang", "Hookshot", "Bomb", "Powder", "Rod", "Lamp"], 5)),
+        "goal": {"1": "ganon"},
+        "gt_crystals": {"1": 7},
+        "ganon_crystals": {"1": 7},
+        "shuffle": {"1": entrance_shuffle},
+        "boss_shuffle": {"1": "random" if boss_shuffle else "none"},
+        "shuffle_followers": {"1": follower_shuffle},
+    }
+    return data
+
+
+def make_patch(seed: int = 0, rom_size: int = 0x200000, chunks: int = 4000) -> dict:
+    """Build a jsonrom patch dict with non-overlapping chunks spread over the ROM.
+
+    The addresses spoiler_utils reads are always covered with valid prize bytes.
+    """
+    rng = random.Random(seed)
+    starts = sorted(rng.sample(range(0, rom_size, 16), chunks))
+    patch: dict[str, list[int]] = {}
+    for i, start in enumerate(starts):
+        limit = (starts[i + 1] if i + 1 < len(starts) else rom_size) - start
+        length = rng.randint(1, min(limit, 512))
+        patch[str(start)] = [rng.choice(_PRIZE_BYTES) for _ in range(length)]
+
+    # Overwrite whatever covers the decoded addresses with single-purpose chunks.
+    for address, length in (
+        (0x180020, 1),
+        (0xEFBD4, 3),
+        (0x329C4, 1),
+        (0x329C8, 1),
+        (0x37993, 1),
+        (0xE82CC, 1),
+        (0x37A78, 56),
+    ):
+        for start in [int(s) for s in patch]:
+            end = start + len(patch[str(start)])
+            if start < address + length and address < end:
+                del patch[str(start)]
+        patch[str(address)] = [rng.choice(_PRIZE_BYTES) for _ in range(length)]
+    return patch
@@ -33,4 +33,11 @@ def import_config():
             False if config["racetime_local_instance"] == "False" else True
         )
 
+    if "racetime_max_finished_races" in config:
+        # None (or no value) keeps every finished race
+        value = config["racetime_max_finished_races"]
+        config["racetime_max_finished_races"] = (
+            None if not value or value == "None" else int(value)
+        )
+
     return config
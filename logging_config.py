@@ -26,9 +26,6 @@ class DiscordWebhookHandler(logging.Handler):
     def emit(self, record):
         log_entry = self.format(record)
         webhook_url = DISCORD_WEBHOOK_URL
-        if log_entry.endswith("[racetime_bot] - INFO - Refresh races"):
-            # Skip this specific log entry so we don't spam Discord
-            return
         if webhook_url:
             if (
                 len(self.buffer) + len(log_entry) + len("\n")
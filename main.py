@@ -7,12 +7,36 @@ from services.apscheduler import APSchedulerService
 from services.discord import DiscordService
 from services.database import DatabaseService
 from services.s3 import S3Service
+from services.spoiler_index import SpoilerIndexService
+from services.upload_queue import SpoilerUploadQueue
 import services.api as api
 from apscheduler.triggers.cron import CronTrigger
 from config import import_config
 import asyncio
 import app_context
 import utils.race_utils as race_utils
+import utils.spoiler_utils as spoiler_utils
+import utils.generation_utils as generation_utils
+
+# Fire-and-forget tasks. The event loop only holds weak references to tasks, so keep
+# them here until they finish.
+background_tasks: set[asyncio.Task] = set()
+
+
+def start_background_task(coro, name: str) -> asyncio.Task:
+    """Run coro as a task that is kept alive until done, logging it if it fails."""
+    task = asyncio.create_task(coro, name=name)
+    background_tasks.add(task)
+
+    def done(task: asyncio.Task):
+        background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.getLogger("pyladderchicken").error(
+                f"Background task {name} failed", exc_info=task.exception()
+            )
+
+    task.add_done_callback(done)
+    return task
 
 
 async def main():
@@ -23,7 +47,13 @@ async def main():
     logger.info("LadderChicken is starting up 🥚...")
     logger.info("Setting up services...")
 
-    avianart = AvianartService(config["avianart_api_url"], config["avianart_api_key"])
+    avianart = AvianartService(
+        config["avianart_api_url"],
+        config["avianart_api_key"],
+        max_generations=int(config.get("avianart_max_generations") or 3),
+        requests_per_second=float(config.get("avianart_requests_per_second") or 2),
+        spool_dir=config.get("avianart_spool_dir"),
+    )
 
     try:
         racetime = RacetimeService(
@@ -31,6 +61,7 @@ async def main():
             config["racetime_client_id"],
             config["racetime_client_secret"],
             local_instance=config.get("racetime_local_instance", False),
+            max_finished_races=config.get("racetime_max_finished_races", 500),
         )
     except requests.exceptions.ConnectionError as e:
         logger.error(
@@ -55,12 +86,35 @@ async def main():
         secret_key=config["s3_secret_key"],
         bucket_name=config["s3_public_bucket_name"],
     )
+    spoiler_index = SpoilerIndexService(
+        config.get("spoiler_index_path") or "spoiler_index.sqlite3"
+    )
+    spoiler_uploads = SpoilerUploadQueue(
+        config.get("spoiler_spool_dir") or "spool/spoilers",
+        on_uploaded=race_utils.spoiler_upload_completed,
+    )
     racetime.start()
     discord_task = asyncio.create_task(discord.start_bot())
     api_task = asyncio.create_task(api.main())
 
     # Store services in the app context for global access
-    app_context.set_services(avianart, racetime, discord, database, scheduler, s3)
+    app_context.set_services(
+        avianart,
+        racetime,
+        discord,
+        database,
+        scheduler,
+        s3,
+        spoiler_index,
+        spoiler_uploads,
+    )
+    await spoiler_uploads.start()
+
+    # Seed poll timing from past generations so the first roll of each preset after a
+    # restart does not start from scratch.
+    for stats in generation_utils.get_generation_stats():
+        if stats.p50 is not None:
+            avianart.record_gentime(stats.preset, stats.namespace, stats.p50)
     await asyncio.sleep(5)
 
     await race_utils.schedule_future_races()
@@ -76,11 +130,21 @@ async def main():
 
     logger.info("LadderChicken startup complete 🐔...")
 
+    # The spoiler converter is imported lazily; load it off the event loop now that
+    # startup is done so the first spoiler race does not pay for it.
+    start_background_task(
+        asyncio.to_thread(spoiler_utils.prewarm), "prewarm_spoiler_converter"
+    )
+
     try:
         while True:
             await asyncio.sleep(1)
     except KeyboardInterrupt:
         await discord.stop_bot()
+        await avianart.close()
+        await spoiler_uploads.stop()
+        s3.shutdown(wait=False)
+        await racetime.close()
         await racetime.stop()
         await scheduler.scheduler.shutdown()
         print("Shutting down gracefully...")
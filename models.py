@@ -1,5 +1,5 @@
 from sqlalchemy import ForeignKey, Text, Integer
-from sqlalchemy.dialects.mysql import TINYINT, SMALLINT, BIT, BIGINT, TEXT, DATETIME, INTEGER
+from sqlalchemy.dialects.mysql import TINYINT, SMALLINT, BIT, BIGINT, TEXT, DATETIME, INTEGER, DOUBLE
 from sqlalchemy.orm import declarative_base, relationship, Mapped, mapped_column
 from datetime import datetime
 from typing import List, Optional
@@ -157,3 +157,54 @@ class Setting(Base):
     )
     value: Mapped[str] = mapped_column(Text, nullable=False)
     type: Mapped[str] = mapped_column(Text, nullable=False, index=True)
+
+
+class SpoilerUpload(Base):
+    __tablename__ = "spoilerUploads"
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True, autoincrement=True)
+    objectName: Mapped[str] = mapped_column(TEXT, nullable=False)
+    spoolPath: Mapped[str] = mapped_column(TEXT, nullable=False)
+    contentEncoding: Mapped[Optional[str]] = mapped_column(TEXT, nullable=True)
+    cacheControl: Mapped[Optional[str]] = mapped_column(TEXT, nullable=True)
+    raceId: Mapped[Optional[int]] = mapped_column(
+        BIGINT, ForeignKey("races.id"), nullable=True
+    )
+    # pending, uploaded or failed
+    status: Mapped[str] = mapped_column(TEXT, nullable=False, default="pending")
+    attempts: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Naive UTC
+    nextAttempt: Mapped[datetime] = mapped_column(DATETIME, nullable=False)
+    lastError: Mapped[Optional[str]] = mapped_column(TEXT, nullable=True)
+    created: Mapped[datetime] = mapped_column(DATETIME, nullable=False)
+    completed: Mapped[Optional[datetime]] = mapped_column(DATETIME, nullable=True)
+
+
+class PreRolledSeed(Base):
+    __tablename__ = "preRolledSeeds"
+    scheduledRaceId: Mapped[int] = mapped_column(
+        BIGINT, ForeignKey("schedule.id"), primary_key=True
+    )
+    # Mode the seed was rolled for, a seed for a different mode is not used
+    modeId: Mapped[int] = mapped_column(SMALLINT, ForeignKey("modes.id"), nullable=False)
+    seed: Mapped[str] = mapped_column(TEXT, nullable=False)
+    # Naive UTC
+    created: Mapped[datetime] = mapped_column(DATETIME, nullable=False)
+    claimed: Mapped[Optional[datetime]] = mapped_column(DATETIME, nullable=True)
+
+
+class SeedGeneration(Base):
+    __tablename__ = "seedGenerations"
+    id: Mapped[int] = mapped_column(BIGINT, primary_key=True, autoincrement=True)
+    namespace: Mapped[Optional[str]] = mapped_column(TEXT, nullable=True)
+    preset: Mapped[str] = mapped_column(TEXT, nullable=False)
+    seed: Mapped[Optional[str]] = mapped_column(TEXT, nullable=True)
+    # success, failure (reported by AVIANART), timeout or error
+    outcome: Mapped[str] = mapped_column(TEXT, nullable=False)
+    # Seconds from the generation request until the seed was ready or given up on
+    wallTime: Mapped[float] = mapped_column(DOUBLE(asdecimal=False), nullable=False)
+    # As reported by AVIANART
+    gentime: Mapped[Optional[int]] = mapped_column(INTEGER, nullable=True)
+    attempts: Mapped[Optional[int]] = mapped_column(INTEGER, nullable=True)
+    polls: Mapped[int] = mapped_column(INTEGER, nullable=False, default=0)
+    # Naive UTC
+    created: Mapped[datetime] = mapped_column(DATETIME, nullable=False)
@@ -165,3 +165,41 @@ class PingableModeRoleWrite(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class SpoilerUploadWrite(BaseModel):
+    objectName: str
+    spoolPath: str
+    contentEncoding: Optional[str] = None
+    cacheControl: Optional[str] = None
+    raceId: Optional[int] = None
+    nextAttempt: datetime
+    created: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class PreRolledSeedWrite(BaseModel):
+    scheduledRaceId: int
+    modeId: int
+    seed: str
+    created: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class SeedGenerationWrite(BaseModel):
+    namespace: Optional[str] = None
+    preset: str
+    seed: Optional[str] = None
+    outcome: str
+    wallTime: float
+    gentime: Optional[int] = None
+    attempts: Optional[int] = None
+    polls: int = 0
+    created: datetime
+
+    class Config:
+        from_attributes = True
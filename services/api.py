@@ -1,8 +1,11 @@
-from fastapi import FastAPI
+import datetime
+from fastapi import FastAPI, HTTPException
 import app_context as ac
 import logging
 import uvicorn
 
+from utils import generation_utils
+
 app = FastAPI(
     title="LadderChicken API",
     description="API for the LadderChicken project",
@@ -15,6 +18,63 @@ def read_root():
     return {"Hello": "World"}
 
 
+def _spoiler_index():
+    if ac.spoiler_index_service is None:
+        raise HTTPException(status_code=503, detail="Spoiler index is not available")
+    return ac.spoiler_index_service
+
+
+@app.get("/spoilers/items/{item}")
+def find_spoiler_item(
+    item: str, season: int | None = None, location: str | None = None, limit: int = 500
+):
+    """Every placement of an item across indexed seeds, newest first."""
+    index = _spoiler_index()
+    return {
+        "item": item,
+        "season": season,
+        "seeds": index.seed_count(season),
+        "placements": index.find_item(item, season=season, location=location, limit=limit),
+    }
+
+
+@app.get("/spoilers/items/{item}/locations")
+def spoiler_item_locations(
+    item: str, season: int | None = None, location: str | None = None, limit: int = 100
+):
+    """How many seeds had an item at each location, most common first."""
+    index = _spoiler_index()
+    return {
+        "item": item,
+        "season": season,
+        "seeds": index.seed_count(season),
+        "locations": index.location_counts(item, season=season, location=location, limit=limit),
+    }
+
+
+@app.get("/generation/stats")
+def generation_stats(namespace: str | None = None, preset: str | None = None, days: int = 60):
+    """Seed generation times and failure rates per preset, slowest first."""
+    if ac.database_service is None:
+        raise HTTPException(status_code=503, detail="Database is not available")
+    return {
+        "days": days,
+        "presets": generation_utils.get_generation_stats(
+            namespace=namespace,
+            preset=preset.lower() if preset else None,
+            window=datetime.timedelta(days=days),
+        ),
+    }
+
+
+@app.get("/racetime/handlers")
+def racetime_handlers():
+    """Live race handlers and what is retained for finished race rooms."""
+    if ac.racetime_service is None:
+        raise HTTPException(status_code=503, detail="Racetime is not available")
+    return ac.racetime_service.handler_metrics()
+
+
 async def main():
     config = uvicorn.Config(
         app,
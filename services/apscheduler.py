@@ -13,6 +13,7 @@ from services.discord import DiscordService
 from services.database import DatabaseService
 
 import utils.race_utils as race_utils
+from utils.generation_utils import roll_lead_time
 import app_context as ac
 
 
@@ -70,8 +71,10 @@ class APSchedulerService:
         # 1.
         #   a. Open room 30 mins prior to time
         #   b. Ping roles in discord and update schedule with room link
+        #   c. Pre-roll the seed 1 min after the room opens (not for grabbag)
         # 2
-        #   a. Roll seed 10 mins prior to time
+        #   a. Roll (or reveal the pre-rolled) seed 10 mins prior to time, or earlier
+        #      for presets that are slow to generate
         #   b. If only one player present, ping @fairy or @potion
         # 3. Ping @unready in rt.gg 1 minute before start
         # 4. Force start the race at time
@@ -82,7 +85,13 @@ class APSchedulerService:
         # Race time is in EST, so we need to first label it as EST and then convert it to UTC
         race_utc_datetime = race.time.replace(tzinfo=est).astimezone(utc)
 
-        self.logger.info(f"Scheduling ladder race {race.id} at {race_utc_datetime} UTC")
+        # Slow presets are rolled earlier, based on how long they have taken to generate
+        roll_lead = roll_lead_time(race.mode_obj, open_mins_before_start)
+        roll_time = race_utc_datetime - roll_lead
+
+        self.logger.info(
+            f"Scheduling ladder race {race.id} at {race_utc_datetime} UTC, rolling {roll_lead} before"
+        )
 
         self.scheduler.add_job(
             race_utils.open_race_room,
@@ -96,7 +105,7 @@ class APSchedulerService:
             # Allow room to be opened until we 1 min before we try to roll the seed
             misfire_grace_time=int(
                 (
-                    (race_utc_datetime - datetime.timedelta(minutes=11))
+                    (roll_time - datetime.timedelta(minutes=1))
                     - (
                         race_utc_datetime
                         - datetime.timedelta(minutes=open_mins_before_start)
@@ -105,10 +114,27 @@ class APSchedulerService:
             ),
         )
 
+        # Pre-roll the seed once the room is open so roll_seed only has to reveal it.
+        # Grabbag modes are picked at roll time, so they are always rolled live.
+        pre_roll_time = race_utc_datetime - datetime.timedelta(
+            minutes=open_mins_before_start - 1
+        )
+        pre_roll_latest = roll_time - datetime.timedelta(minutes=5)
+        if race.mode_obj.slug != 'ladder/grabbag' and pre_roll_time < pre_roll_latest:
+            self.scheduler.add_job(
+                race_utils.pre_roll_seed,
+                trigger=DateTrigger(pre_roll_time, timezone=utc),
+                args=(race_id, int(roll_lead.total_seconds() // 60)),
+                id=f"pre_roll_seed_{race_id}",
+                replace_existing=True,
+                # Not worth starting with less than 5 minutes to go before the roll
+                misfire_grace_time=int((pre_roll_latest - pre_roll_time).total_seconds()),
+            )
+
         self.scheduler.add_job(
             race_utils.roll_seed,
             trigger=DateTrigger(
-                race_utc_datetime - datetime.timedelta(minutes=10),
+                roll_time,
                 timezone=utc,
             ),
             args=(race_id,),
@@ -118,7 +144,7 @@ class APSchedulerService:
             misfire_grace_time=int(
                 (
                     (race_utc_datetime - datetime.timedelta(minutes=5))
-                    - (race_utc_datetime - datetime.timedelta(minutes=10))
+                    - roll_time
                 ).seconds
             ),
         )
@@ -1,11 +1,21 @@
 import asyncio
+import datetime
+import heapq
+import itertools
+import json
+import math
+import mmap
+import os
+import re
+import tempfile
 from enum import Enum
 from dataclasses import dataclass
-import requests
+import aiohttp
 from typing import Optional, Dict, Any
 import logging
 
 import app_context as ac
+import schemas
 
 MMMM_GEN_BODY = [
     {
@@ -59,50 +69,623 @@ class Meta:
     gentime: Optional[int] = None
 
 
-@dataclass
+# Members of a response that are only decoded when first accessed. Together they are
+# nearly all of a finished seed's permalink.
+LAZY_FIELDS = ("patch", "spoiler")
+
+_JSON_STRING = re.compile(rb'"[^"\\]*+(?:\\.[^"\\]*+)*+"', re.DOTALL)
+# Skips everything up to and including the next string or bracket. Strings are
+# matched whole so brackets inside them are not counted.
+_JSON_STEP = re.compile(
+    rb'[^"{}\[\]]*+(?:"[^"\\]*+(?:\\.[^"\\]*+)*+"|[{}\[\]])', re.DOTALL
+)
+_JSON_SCALAR_END = re.compile(rb"\s*[,}\]]")
+_JSON_WHITESPACE = re.compile(rb"\s*")
+_OPEN = frozenset(b"{[")
+_CLOSE = frozenset(b"}]")
+
+
+def _json_value_end(buf, pos: int) -> int:
+    """Index just past the JSON value starting at buf[pos], without decoding it."""
+    first = buf[pos]
+    if first == ord('"'):
+        return _JSON_STRING.match(buf, pos).end()
+    if first in _OPEN:
+        depth = 0
+        step = _JSON_STEP.match
+        while True:
+            token = step(buf, pos)
+            if token is None:
+                raise ValueError(f"Unterminated JSON value at {pos}")
+            pos = token.end()
+            char = buf[pos - 1]
+            if char in _OPEN:
+                depth += 1
+            elif char in _CLOSE:
+                depth -= 1
+                if depth == 0:
+                    return pos
+    end = _JSON_SCALAR_END.search(buf, pos)
+    if end is None:
+        return len(buf)
+    return end.start()
+
+
+def _scan_object(buf, pos: int, expand: str = None) -> tuple[dict, int]:
+    pos = _JSON_WHITESPACE.match(buf, pos).end()
+    if buf[pos] != ord("{"):
+        raise ValueError(f"Expected a JSON object at {pos}")
+    pos += 1
+    spans = {}
+    while True:
+        pos = _JSON_WHITESPACE.match(buf, pos).end()
+        char = buf[pos]
+        if char == ord("}"):
+            return spans, pos + 1
+        if char == ord(","):
+            pos += 1
+            continue
+        key = _JSON_STRING.match(buf, pos)
+        if key is None:
+            raise ValueError(f"Expected a JSON object key at {pos}")
+        name = json.loads(key.group())
+        pos = _JSON_WHITESPACE.match(buf, key.end()).end()
+        if buf[pos] != ord(":"):
+            raise ValueError(f"Expected ':' at {pos}")
+        pos = _JSON_WHITESPACE.match(buf, pos + 1).end()
+        if name == expand and buf[pos] == ord("{"):
+            spans[name], pos = _scan_object(buf, pos)
+        else:
+            end = _json_value_end(buf, pos)
+            spans[name] = (pos, end)
+            pos = end
+
+
+def json_member_spans(buf, pos: int = 0, expand: str = None) -> dict:
+    """
+    Spans of the member values of the JSON object at buf[pos], found by skipping over
+    nested values rather than decoding them. buf can be bytes or an mmap. If the member
+    named expand holds an object, its member spans are returned in its place, so the
+    body is only scanned once.
+    """
+    return _scan_object(buf, pos, expand)[0]
+
+
 class AvianResponsePayload:
-    hash: str
-    message: str
-
-    attempts: Optional[int] = None
-    status: Optional[AvianartGenStatus] = None
-    logic: Optional[str] = None
-    patch: Optional[Dict] = None
-    spoiler: Optional[SpoilerMeta] = None
-    generated: Optional[str] = None
-    size: Optional[int] = None
-    vt: Optional[bool] = None
-    basepatch: Optional[BasePatch] = None
-    meta: Optional[Meta] = None
-    fshash: Optional[str] = None
-    starttime: Optional[int] = None
-    gentime: Optional[int] = None
-    type: Optional[str] = None
-    bps_t0_p1: Optional[str] = None
-    returnCode: Optional[int] = None
+    """
+    The response part of an AVIANART API reply.
+
+    Built from a raw permalink body with from_raw, only the small members are decoded
+    up front. patch and spoiler are decoded from the body the first time they are
+    accessed, so polls that only look at status never parse them. Once both have been
+    decoded the body is released, unless keep_raw is set.
+    """
+
+    FIELDS = (
+        "hash",
+        "message",
+        "attempts",
+        "status",
+        "logic",
+        "generated",
+        "size",
+        "vt",
+        "basepatch",
+        "meta",
+        "fshash",
+        "starttime",
+        "gentime",
+        "type",
+        "bps_t0_p1",
+        "returnCode",
+    )
+    __slots__ = FIELDS + ("_patch", "_spoiler", "_raw", "_spans", "_keep_raw")
+
+    def __init__(
+        self,
+        hash: str,
+        message: str,
+        attempts: Optional[int] = None,
+        status: Optional[str] = None,
+        logic: Optional[str] = None,
+        patch: Optional[Dict] = None,
+        spoiler: Optional[Dict] = None,
+        generated: Optional[str] = None,
+        size: Optional[int] = None,
+        vt: Optional[bool] = None,
+        basepatch: Optional[Dict] = None,
+        meta: Optional[Dict] = None,
+        fshash: Optional[str] = None,
+        starttime: Optional[int] = None,
+        gentime: Optional[int] = None,
+        type: Optional[str] = None,
+        bps_t0_p1: Optional[str] = None,
+        returnCode: Optional[int] = None,
+    ):
+        self.hash = hash
+        self.message = message
+        self.attempts = attempts
+        self.status = status
+        self.logic = logic
+        self.generated = generated
+        self.size = size
+        self.vt = vt
+        self.basepatch = basepatch
+        self.meta = meta
+        self.fshash = fshash
+        self.starttime = starttime
+        self.gentime = gentime
+        self.type = type
+        self.bps_t0_p1 = bps_t0_p1
+        self.returnCode = returnCode
+        self._patch = patch
+        self._spoiler = spoiler
+        self._raw = None
+        self._spans: dict[str, tuple[int, int]] = {}
+        self._keep_raw = False
+
+    @classmethod
+    def from_raw(
+        cls, raw, spans: dict[str, tuple[int, int]], keep_raw: bool = False
+    ) -> "AvianResponsePayload":
+        """
+        Build a payload from the member spans of the response object within raw (bytes
+        or an mmap), decoding everything except the LAZY_FIELDS. Unknown members are
+        ignored.
+        """
+        values = {
+            name: json.loads(raw[start:end])
+            for name, (start, end) in spans.items()
+            if name in cls.FIELDS
+        }
+        payload = cls(**values)
+        payload._raw = raw
+        payload._spans = {name: spans[name] for name in LAZY_FIELDS if name in spans}
+        payload._keep_raw = keep_raw
+        if not payload._spans:
+            payload._release()
+        return payload
+
+    def _decode(self, name: str) -> Any:
+        start, end = self._spans.pop(name)
+        value = json.loads(self._raw[start:end])
+        if not self._spans:
+            self._release()
+        return value
+
+    def _release(self):
+        if self._keep_raw:
+            return
+        if isinstance(self._raw, mmap.mmap):
+            self._raw.close()
+        self._raw = None
+
+    @property
+    def raw(self):
+        """The body this payload was read from, while it is held."""
+        return self._raw
+
+    @property
+    def patch(self) -> Optional[Dict]:
+        if "patch" in self._spans:
+            self._patch = self._decode("patch")
+        return self._patch
+
+    @patch.setter
+    def patch(self, value: Optional[Dict]):
+        self._spans.pop("patch", None)
+        self._patch = value
+
+    @property
+    def spoiler(self) -> Optional[Dict]:
+        if "spoiler" in self._spans:
+            self._spoiler = self._decode("spoiler")
+        return self._spoiler
+
+    @spoiler.setter
+    def spoiler(self, value: Optional[Dict]):
+        self._spans.pop("spoiler", None)
+        self._spoiler = value
+
+    @property
+    def has_patch(self) -> bool:
+        """Whether the response carries a patch, checked without decoding it."""
+        if "patch" not in self._spans:
+            return bool(self._patch)
+        start, end = self._spans["patch"]
+        # Anything longer than this is a non-empty value
+        return end - start > 5 or self._raw[start:end] not in (
+            b"null",
+            b"false",
+            b"{}",
+            b"[]",
+            b'""',
+        )
 
+    def __repr__(self) -> str:
+        return f"AvianResponsePayload(hash={self.hash!r}, status={self.status!r}, message={self.message!r})"
 
-@dataclass
+
+@dataclass(slots=True)
 class AvianartGenPayload:
     status: int
     response: AvianResponsePayload
 
 
+# Responses above this size (permalinks carrying the full patch) are read off the event loop.
+LARGE_RESPONSE_BYTES = 256 * 1024
+
+# Permalink polling bounds, in seconds.
+MIN_POLL_INTERVAL = 1.0
+MAX_POLL_INTERVAL = 15.0
+# With a deadline, the last poll is made this long before it.
+FINAL_POLL_MARGIN = 1.0
+# Weight of the newest observation in the per-preset generation time average.
+GENTIME_SMOOTHING = 0.3
+
+
+def poll_interval(
+    phase: Optional[AvianartGenStatus],
+    elapsed: float,
+    expected: Optional[float],
+    polls_in_phase: int,
+) -> float:
+    """
+    Seconds to wait before the next permalink poll.
+
+    When the usual generation time is known, the next poll is timed for when the seed
+    should be ready. Postgen is short, so it is polled quickly. Otherwise, and once a
+    seed is running late, the interval backs off towards MAX_POLL_INTERVAL.
+    """
+    if phase == AvianartGenStatus.POSTGEN:
+        return MIN_POLL_INTERVAL
+    if expected is not None and elapsed < expected:
+        return min(MAX_POLL_INTERVAL, max(MIN_POLL_INTERVAL, expected - elapsed))
+    if phase == AvianartGenStatus.GENERATION:
+        return min(MAX_POLL_INTERVAL, 2.0 * 1.5**polls_in_phase)
+    # Pregeneration (possibly queued behind other seeds) or an unknown status.
+    return min(5.0, MIN_POLL_INTERVAL * 1.5**polls_in_phase)
+
+
+def _parse_gen_status(status: Optional[str]) -> Optional[AvianartGenStatus]:
+    try:
+        return AvianartGenStatus(status) if status else None
+    except ValueError:
+        return None
+
+
+class RateLimiter:
+    """
+    Token bucket allowing rate requests per second on average, with bursts of up to
+    burst requests. Waiters are served in arrival order.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = None
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            while True:
+                now = loop.time()
+                if self._updated is not None:
+                    self._tokens = min(
+                        self.burst, self._tokens + (now - self._updated) * self.rate
+                    )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class GenerationSlots:
+    """
+    Bounded pool of concurrent generations. When all slots are taken, waiters get the
+    next free slot earliest deadline first, then in arrival order.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.active = 0
+        self._waiters: list[tuple[float, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+
+    async def acquire(self, deadline: float = math.inf):
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (deadline, next(self._counter), waiter))
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Handed a slot just as we were cancelled, pass it on
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        # The slot goes straight to the next waiter still waiting, if any
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+
+@dataclass
+class _Generation:
+    """A generation in flight, as tracked by the shared polling loop."""
+
+    seed_hash: str
+    started: float
+    expected: Optional[float]
+    future: asyncio.Future
+    deadline: float = math.inf
+    phase: Optional[AvianartGenStatus] = AvianartGenStatus.PREGEN
+    polls: int = 0
+    polls_in_phase: int = 0
+    next_poll: float = 0.0
+
+
 class AvianartService:
     """
     Service class for handling avian art generation requests.
+
+    All requests share one aiohttp session, so polling reuses kept-alive connections
+    instead of opening a new TLS connection per request. Requests are rate limited per
+    API key, shared by every service instance using that key.
     """
 
-    def __init__(self, url: str, api_key: str):
+    _rate_limiters: dict[str, RateLimiter] = {}
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        timeout: aiohttp.ClientTimeout = None,
+        connection_limit: int = 8,
+        max_generations: int = 3,
+        requests_per_second: float = 2.0,
+        request_burst: int = 5,
+        keep_raw: bool = False,
+        spool_dir: str = None,
+    ):
         self.url = url
         self.api_key = api_key
         self.logger: logging.Logger = logging.getLogger("avianart")
+        self.timeout = timeout or aiohttp.ClientTimeout(
+            total=120, connect=10, sock_read=60
+        )
+        self.connection_limit = connection_limit
+        # Keep permalink bodies after their patch and spoiler are decoded
+        self.keep_raw = keep_raw
+        # Large permalink bodies are spooled here and memory-mapped instead of held in memory
+        self.spool_dir = spool_dir
+        if spool_dir:
+            os.makedirs(spool_dir, exist_ok=True)
+        self._session: aiohttp.ClientSession = None
+        # Smoothed wall-clock generation time per namespace/preset, in seconds.
+        self._gentimes: dict[str, float] = {}
+
+        self._slots = GenerationSlots(max_generations)
+        # The first service created for a key sets its rate
+        if api_key not in self._rate_limiters:
+            self._rate_limiters[api_key] = RateLimiter(requests_per_second, request_burst)
+        self._rate_limiter = self._rate_limiters[api_key]
+        # Generations being polled, by seed hash
+        self._generations: dict[str, _Generation] = {}
+        self._poller: asyncio.Task = None
+        self._poller_wake = asyncio.Event()
+        # Permalink polls in flight, each its own task so a slow one holds up no other
+        self._poll_tasks: set[asyncio.Task] = set()
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily, a ClientSession has to be made inside the running event loop.
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=self.timeout,
+                headers={"Authorization": f"{self.api_key}"},
+            )
+        return self._session
+
+    async def close(self):
+        if self._poller is not None:
+            self._poller.cancel()
+        for task in self._poll_tasks:
+            task.cancel()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def _read_json(self, response: aiohttp.ClientResponse) -> Any:
+        """
+        Read the body in chunks as it arrives and decode it straight from bytes, skipping
+        the intermediate str. Large bodies are decoded in a worker thread; the decoder
+        still holds the GIL, but this roughly halves the event loop stall compared with
+        decoding a full patch in place.
+        """
+        body = bytearray()
+        async for chunk in response.content.iter_chunked(64 * 1024):
+            body += chunk
+        if len(body) > LARGE_RESPONSE_BYTES:
+            return await asyncio.to_thread(json.loads, body)
+        return json.loads(body)
+
+    async def _read_body(self, response: aiohttp.ClientResponse):
+        """
+        Read the body in chunks as it arrives. With spool_dir set, a body that grows past
+        LARGE_RESPONSE_BYTES goes to an unnamed temporary file there instead, which is
+        returned memory-mapped.
+        """
+        body = bytearray()
+        spool = None
+        try:
+            async for chunk in response.content.iter_chunked(64 * 1024):
+                if spool is not None:
+                    spool.write(chunk)
+                    continue
+                body += chunk
+                if self.spool_dir and len(body) > LARGE_RESPONSE_BYTES:
+                    spool = tempfile.TemporaryFile(dir=self.spool_dir)
+                    spool.write(body)
+                    body = None
+            if spool is None:
+                return body
+            spool.flush()
+            # The mapping holds its own handle, the file goes away once it is closed
+            return mmap.mmap(spool.fileno(), 0, access=mmap.ACCESS_READ)
+        finally:
+            if spool is not None:
+                spool.close()
+
+    def _parse_permalink(self, raw) -> AvianartGenPayload:
+        spans = json_member_spans(raw, expand="response")
+        status_start, status_end = spans["status"]
+        return AvianartGenPayload(
+            status=json.loads(raw[status_start:status_end]),
+            response=AvianResponsePayload.from_raw(
+                raw, spans["response"], keep_raw=self.keep_raw
+            ),
+        )
+
+    def expected_gentime(self, preset: str, namespace: str = "") -> Optional[float]:
+        """
+        Usual generation time for a preset, falling back to the average over all
+        presets seen so far.
+        """
+        expected = self._gentimes.get(f"{namespace or ''}/{preset.lower()}")
+        if expected is None and self._gentimes:
+            expected = sum(self._gentimes.values()) / len(self._gentimes)
+        return expected
+
+    def record_gentime(self, preset: str, namespace: str, seconds: float):
+        key = f"{namespace or ''}/{preset.lower()}"
+        previous = self._gentimes.get(key)
+        if previous is None:
+            self._gentimes[key] = seconds
+        else:
+            self._gentimes[key] = previous + GENTIME_SMOOTHING * (seconds - previous)
+
+    def _poll_interval(
+        self,
+        phase: Optional[AvianartGenStatus],
+        elapsed: float,
+        expected: Optional[float],
+        polls_in_phase: int,
+    ) -> float:
+        return poll_interval(phase, elapsed, expected, polls_in_phase)
+
+    async def _alert(self, message: str, notify: bool = True):
+        if not notify:
+            return
+        admin_role = ac.database_service.get_setting("admin_role_id")
+        admin_ping = f"<@&{admin_role}> " if admin_role else ""
+        await ac.discord_service.send_message(
+            content=f"{admin_ping}{message}", force_mention=True
+        )
+
+    def _record_generation(
+        self,
+        namespace: str,
+        preset: str,
+        outcome: str,
+        wall_time: float,
+        seed_hash: str = None,
+        payload: AvianartGenPayload = None,
+        polls: int = 0,
+    ):
+        """Store the outcome of a generation for the per-preset statistics."""
+        try:
+            ac.database_service.add_seed_generation(
+                schemas.SeedGenerationWrite(
+                    namespace=namespace or None,
+                    preset=preset,
+                    seed=seed_hash,
+                    outcome=outcome,
+                    wallTime=wall_time,
+                    gentime=payload.response.gentime if payload else None,
+                    attempts=payload.response.attempts if payload else None,
+                    polls=polls,
+                    created=datetime.datetime.now(datetime.UTC).replace(tzinfo=None),
+                )
+            )
+        except Exception as e:
+            self.logger.warning(f"Could not record generation of {namespace}/{preset}: {e}")
+
+    async def _trigger_generation(
+        self,
+        generation_url: str,
+        request_body: list,
+        namespace: str,
+        preset: str,
+        notify: bool,
+    ) -> Optional[str]:
+        """Start a generation and return its hash, or None if AVIANART was unreachable."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            await self._rate_limiter.acquire()
+            async with self._get_session().post(
+                generation_url,
+                json=request_body,
+            ) as generation_response:
+                if generation_response.status == 200:
+                    generation_data = await self._read_json(generation_response)
+                else:
+                    generation_text = await generation_response.text()
+        except Exception as e:
+            self.logger.error(f"Could not reach AVIANART: {e}")
+            self._record_generation(namespace, preset, "error", loop.time() - started)
+            await self._alert(f"Could not reach AVIANART:\n```{e}```", notify)
+            return None
+
+        if generation_response.status != 200:
+            self.logger.error(
+                f"Failed to trigger seed generation using {namespace}/{preset}: {generation_text}"
+            )
+            self._record_generation(namespace, preset, "error", loop.time() - started)
+            await self._alert(
+                f"Failed to trigger seed generation using {namespace}/{preset}:\n```{generation_text}```",
+                notify,
+            )
+            raise Exception(
+                f"Failed to trigger seed generation using {namespace}/{preset}: {generation_text}"
+            )
+
+        return generation_data["response"].get("hash")
 
     async def generate_seed(
-        self, preset: str, race: bool, namespace: str = "", spoiler: bool = False, mystery: bool = False
+        self,
+        preset: str,
+        race: bool,
+        namespace: str = "",
+        spoiler: bool = False,
+        mystery: bool = False,
+        deadline: datetime.datetime = None,
+        notify: bool = True,
     ) -> AvianartGenPayload:
         """
         Trigger seed generation from AVIANART.
+
+        At most max_generations seeds generate at once; further requests wait for a
+        slot, earliest deadline first. The permalinks of all running generations are
+        polled from one shared loop, each at an interval adapted to its generation
+        phase and to how long its preset has taken before. If the seed is not ready by
+        deadline (an aware datetime), it is given up on, admins are pinged and None is
+        returned. With notify False failures are only logged, for callers that have a
+        fallback.
         """
 
         self.logger.debug(
@@ -137,82 +720,221 @@ class AvianartService:
             f"Request body for generation: {request_body} with preset: {preset}"
         )
 
-        admin_role = ac.database_service.get_setting("admin_role_id")
-        admin_ping = f"<@&{admin_role}> " if admin_role else ""
-
-        try:
-            generation_response = requests.post(
-                generation_url,
-                headers={
-                    "Content-Type": "application/json",
-                    "Authorization": f"{self.api_key}",
-                },
-                json=request_body,
-            )
-        except Exception as e:
-            self.logger.error(f"Could not reach AVIANART: {e}")
-            await ac.discord_service.send_message(
-                content=f"{admin_ping}Could not reach AVIANART:\n```{e}```",
-                force_mention=True,
+        loop = asyncio.get_running_loop()
+        remaining = None
+        if deadline is not None:
+            remaining = max(
+                0.0, (deadline - datetime.datetime.now(datetime.UTC)).total_seconds()
             )
-            return
 
-        if generation_response.status_code != 200:
+        generation = None
+        # Set once a slot is held and the generate request is sent
+        posted = None
+        deadline_timeout = asyncio.timeout(remaining)
+        try:
+            async with deadline_timeout:
+                queued = loop.time()
+                loop_deadline = queued + remaining if remaining is not None else math.inf
+                await self._slots.acquire(loop_deadline)
+                try:
+                    if loop.time() - queued > 1:
+                        self.logger.info(
+                            f"Waited {loop.time() - queued:.1f}s for a generation slot for {namespace}/{preset}"
+                        )
+                    posted = loop.time()
+                    seed_hash = await self._trigger_generation(
+                        generation_url, request_body, namespace, preset, notify
+                    )
+                    if seed_hash is None:
+                        return
+
+                    generation = _Generation(
+                        seed_hash=seed_hash,
+                        started=loop.time(),
+                        expected=self.expected_gentime(preset, namespace),
+                        future=loop.create_future(),
+                        deadline=loop_deadline,
+                    )
+                    self._schedule_poll(generation)
+                    self._track(generation)
+                    status = await generation.future
+                finally:
+                    if generation is not None:
+                        self._generations.pop(generation.seed_hash, None)
+                    self._slots.release()
+        except Exception:
+            # Request timeouts are TimeoutErrors too, only the deadline is handled here
+            if not deadline_timeout.expired():
+                if generation is not None:
+                    self._record_generation(
+                        namespace,
+                        preset,
+                        "error",
+                        loop.time() - generation.started,
+                        generation.seed_hash,
+                        polls=generation.polls,
+                    )
+                raise
+            if generation is None and posted is not None:
+                self.logger.error(
+                    f"Generate request for {namespace}/{preset} was still in flight at the deadline"
+                )
+                self._record_generation(namespace, preset, "timeout", loop.time() - posted)
+                await self._alert(
+                    f"AVIANART did not answer the generate request for {namespace}/{preset} in time, a seed needs to be rolled manually!",
+                    notify,
+                )
+                return
+            if generation is None:
+                self.logger.error(
+                    f"No generation slot for {namespace}/{preset} became free before the deadline"
+                )
+                await self._alert(
+                    f"Seed generation for {namespace}/{preset} could not start in time, a seed needs to be rolled manually!",
+                    notify,
+                )
+                return
             self.logger.error(
-                f"Failed to trigger seed generation using {namespace}/{preset}: {generation_response.text}"
+                f"Generation for seed hash {generation.seed_hash} ({namespace}/{preset}) did not finish before the deadline, gave up after {generation.polls} polls"
             )
-            await ac.discord_service.send_message(
-                content=f"{admin_ping}Failed to trigger seed generation using {namespace}/{preset}:\n```{generation_response.text}```",
-                force_mention=True,
+            self._record_generation(
+                namespace,
+                preset,
+                "timeout",
+                loop.time() - generation.started,
+                generation.seed_hash,
+                polls=generation.polls,
             )
-            raise Exception(
-                f"Failed to trigger seed generation using {namespace}/{preset}: {generation_response.text}"
+            await self._alert(
+                f"Seed generation for {namespace}/{preset} (hash {generation.seed_hash}) did not finish in time and was abandoned, a seed needs to be rolled manually!",
+                notify,
             )
+            return
 
-        seed_hash = generation_response.json()["response"].get("hash")
-
-        generation_status = AvianartGenStatus.PREGEN
-        while generation_status != AvianartGenStatus.FAILURE:
-            await asyncio.sleep(5)
-            status = await self.fetch_permalink(seed_hash)
-            if not status.response.status:
-                # Probably done???
-                if status.response.patch:
-                    self.logger.debug(
-                        f"Generation completed for seed hash: {seed_hash}"
-                    )
-                    return status
-            generation_status = status.response.status
+        seed_hash = generation.seed_hash
+        elapsed = loop.time() - generation.started
+        if generation.phase != AvianartGenStatus.FAILURE:
+            self.record_gentime(preset, namespace, elapsed)
+            self._record_generation(
+                namespace, preset, "success", elapsed, seed_hash, status, generation.polls
+            )
             self.logger.debug(
-                f"Current generation status for {seed_hash}: {generation_status}"
+                f"Generation completed for seed hash: {seed_hash} in {elapsed:.1f}s after {generation.polls} polls"
             )
+            return status
+
         self.logger.error(
             f"Generation failed for seed hash: {seed_hash} with message: {status.response.message}"
         )
-        await ac.discord_service.send_message(
-            content=f"{admin_ping}Generation failed for seed hash: {seed_hash} with message:\n```{status.response.message}```",
-            force_mention=True,
+        self._record_generation(
+            namespace, preset, "failure", elapsed, seed_hash, status, generation.polls
         )
+        await self._alert(
+            f"Generation failed for seed hash: {seed_hash} with message:\n```{status.response.message}```",
+            notify,
+        )
+
+    def _track(self, generation: "_Generation"):
+        self._generations[generation.seed_hash] = generation
+        if self._poller is None or self._poller.done():
+            self._poller = asyncio.create_task(self._poll_generations())
+        self._poller_wake.set()
+
+    async def _poll_generations(self):
+        """
+        Single loop scheduling the permalink polls of every generation in flight, each
+        on its own schedule. Runs while there are generations to poll.
+        """
+        loop = asyncio.get_running_loop()
+        while self._generations:
+            now = loop.time()
+            for generation in list(self._generations.values()):
+                if generation.next_poll <= now:
+                    self._start_poll(generation)
+            self._poller_wake.clear()
+            next_poll = min(g.next_poll for g in self._generations.values())
+            try:
+                await asyncio.wait_for(
+                    self._poller_wake.wait(),
+                    timeout=next_poll - now if next_poll != math.inf else None,
+                )
+            except TimeoutError:
+                pass
+
+    def _start_poll(self, generation: "_Generation"):
+        # Not due again until this poll has rescheduled it
+        generation.next_poll = math.inf
+        task = asyncio.create_task(self._poll(generation))
+        self._poll_tasks.add(task)
+        task.add_done_callback(self._poll_done)
+
+    def _poll_done(self, task: asyncio.Task):
+        self._poll_tasks.discard(task)
+        # The generation was rescheduled or is done, either way the poller has to look again
+        self._poller_wake.set()
+
+    async def _poll(self, generation: "_Generation"):
+        try:
+            status = await self.fetch_permalink(generation.seed_hash)
+        except Exception as e:
+            self._generations.pop(generation.seed_hash, None)
+            if not generation.future.done():
+                generation.future.set_exception(e)
+            return
+        generation.polls += 1
+
+        phase = _parse_gen_status(status.response.status)
+        # Probably done???
+        finished = not status.response.status and status.response.has_patch
+        if finished or phase == AvianartGenStatus.FAILURE:
+            generation.phase = phase
+            self._generations.pop(generation.seed_hash, None)
+            if not generation.future.done():
+                generation.future.set_result(status)
+            return
+
+        generation.polls_in_phase = (
+            generation.polls_in_phase + 1 if phase == generation.phase else 0
+        )
+        generation.phase = phase
+        self.logger.debug(
+            f"Current generation status for {generation.seed_hash}: {status.response.status}"
+        )
+        self._schedule_poll(generation)
+
+    def _schedule_poll(self, generation: "_Generation"):
+        now = asyncio.get_running_loop().time()
+        generation.next_poll = now + self._poll_interval(
+            generation.phase,
+            now - generation.started,
+            generation.expected,
+            generation.polls_in_phase,
+        )
+        # Do not sleep through the deadline, make one last poll just before it
+        final_poll = generation.deadline - FINAL_POLL_MARGIN
+        if now < final_poll < generation.next_poll:
+            generation.next_poll = final_poll
 
     async def fetch_permalink(self, seed_hash: str) -> AvianartGenPayload:
         """
         Fetch the permalink for a given seed hash.
         """
         self.logger.debug(f"Fetching permalink for seed hash: {seed_hash}")
-        response = requests.get(
-            f"{self.url}?action=permlink&hash={seed_hash}",
-            headers={"Authorization": self.api_key},
-        )
-
-        if response.status_code != 200:
-            self.logger.error(
-                f"Failed to fetch permalink for {seed_hash}: {response.text}"
-            )
-            raise Exception(
-                f"Failed to fetch permalink for {seed_hash}: {response.text}"
-            )
-
-        data = response.json()
-        return AvianartGenPayload(
-            status=data["status"], response=AvianResponsePayload(**data["response"])
-        )
+        await self._rate_limiter.acquire()
+        async with self._get_session().get(
+            self.url, params={"action": "permlink", "hash": seed_hash}
+        ) as response:
+            if response.status != 200:
+                text = await response.text()
+                self.logger.error(
+                    f"Failed to fetch permalink for {seed_hash}: {text}"
+                )
+                raise Exception(
+                    f"Failed to fetch permalink for {seed_hash}: {text}"
+                )
+
+            raw = await self._read_body(response)
+        # Only the small members are decoded here, patch and spoiler wait until used
+        if len(raw) > LARGE_RESPONSE_BYTES:
+            return await asyncio.to_thread(self._parse_permalink, raw)
+        return self._parse_permalink(raw)
@@ -650,4 +650,110 @@ class DatabaseService:
                 db.refresh(mode)
                 self.get_modes.cache_clear()
                 return mode
-            return None
\ No newline at end of file
+            return None
+
+    def add_spoiler_upload(self, upload: schemas.SpoilerUploadWrite):
+        with Session(self.engine) as db:
+            db_upload = models.SpoilerUpload(**upload.model_dump())
+            db.add(db_upload)
+            db.commit()
+            db.refresh(db_upload)
+            return db_upload
+
+    def get_pending_spoiler_uploads(self):
+        with Session(self.engine) as db:
+            uploads = (
+                db.query(models.SpoilerUpload)
+                .filter(models.SpoilerUpload.status == "pending")
+                .order_by(models.SpoilerUpload.nextAttempt)
+                .all()
+            )
+            return uploads
+
+    def update_spoiler_upload(
+        self,
+        upload_id: int,
+        status: str,
+        attempts: int = None,
+        next_attempt: datetime.datetime = None,
+        last_error: str = None,
+        completed: datetime.datetime = None,
+    ):
+        with Session(self.engine) as db:
+            upload = (
+                db.query(models.SpoilerUpload)
+                .filter(models.SpoilerUpload.id == upload_id)
+                .first()
+            )
+            if upload:
+                upload.status = status
+                if attempts is not None:
+                    upload.attempts = attempts
+                if next_attempt is not None:
+                    upload.nextAttempt = next_attempt
+                if last_error is not None:
+                    upload.lastError = last_error
+                if completed is not None:
+                    upload.completed = completed
+                db.commit()
+                db.refresh(upload)
+                return upload
+            return None
+
+    def add_pre_rolled_seed(self, pre_rolled: schemas.PreRolledSeedWrite):
+        with Session(self.engine) as db:
+            # A scheduled race has at most one pre-rolled seed, a new roll replaces it
+            db_pre_rolled = db.merge(models.PreRolledSeed(**pre_rolled.model_dump(), claimed=None))
+            db.commit()
+            db.refresh(db_pre_rolled)
+            return db_pre_rolled
+
+    def get_pre_rolled_seed(self, scheduled_race_id: int):
+        with Session(self.engine) as db:
+            pre_rolled = (
+                db.query(models.PreRolledSeed)
+                .filter(
+                    models.PreRolledSeed.scheduledRaceId == scheduled_race_id,
+                    models.PreRolledSeed.claimed.is_(None),
+                )
+                .first()
+            )
+            return pre_rolled
+
+    def claim_pre_rolled_seed(self, scheduled_race_id: int, claimed: datetime.datetime):
+        with Session(self.engine) as db:
+            pre_rolled = (
+                db.query(models.PreRolledSeed)
+                .filter(models.PreRolledSeed.scheduledRaceId == scheduled_race_id)
+                .first()
+            )
+            if pre_rolled:
+                pre_rolled.claimed = claimed
+                db.commit()
+                db.refresh(pre_rolled)
+                return pre_rolled
+            return None
+
+    def add_seed_generation(self, generation: schemas.SeedGenerationWrite):
+        with Session(self.engine) as db:
+            db_generation = models.SeedGeneration(**generation.model_dump())
+            db.add(db_generation)
+            db.commit()
+            db.refresh(db_generation)
+            return db_generation
+
+    def get_seed_generations(
+        self,
+        since: datetime.datetime = None,
+        namespace: str = None,
+        preset: str = None,
+    ):
+        with Session(self.engine) as db:
+            query = db.query(models.SeedGeneration)
+            if since is not None:
+                query = query.filter(models.SeedGeneration.created >= since)
+            if namespace is not None:
+                query = query.filter(models.SeedGeneration.namespace == namespace)
+            if preset is not None:
+                query = query.filter(models.SeedGeneration.preset == preset)
+            return query.order_by(models.SeedGeneration.created).all()
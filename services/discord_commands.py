@@ -497,7 +497,7 @@ class SetRaceSeedCommand(
         room_name = ac.database_service.get_race_by_id(race.raceId).raceRoom.lstrip("/")
 
         seed_info = await ac.avianart_service.fetch_permalink(seed_hash)
-        if seed_info.response.status or not seed_info.response.patch:
+        if seed_info.response.status or not seed_info.response.has_patch:
             await ctx.respond(
                 f"Failed to fetch seed with hash {seed_hash}. Please ensure the seed hash is correct and the seed has been generated."
             )
@@ -682,8 +682,11 @@ class RollSeedCommand(
             namespace=namespace,
             spoiler=self.spoiler,
         )
+        if not seed:
+            await ctx.respond("Seed generation failed, admins have been notified.", ephemeral=True)
+            return
         if self.spoiler:
-            spoiler_name = spoiler_utils.avianart_payload_to_spoiler(seed, upload=True)
+            spoiler_name = await spoiler_utils.avianart_payload_to_spoiler(seed, upload=True)
 
             await ctx.respond(
                 f"""You selected **[{mode.archetype_obj.name}] {mode.name}** ({slug})
@@ -1046,6 +1049,71 @@ class SetSpoilerUrl(
         ac.database_service.set_spoiler_url(self.race_id, self.spoiler_url)
         await ctx.respond(f"Spoiler URL for race {self.race_id} set to {self.spoiler_url}.")
 
+@loader.command()
+class SetSpoilerOutputProfile(
+    lightbulb.SlashCommand,
+    name="set_spoiler_output_profile",
+    description="Set how uploaded spoiler logs are serialized and compressed.",
+    default_member_permissions=hikari.Permissions.NONE,
+):
+    profile = lightbulb.string(
+        "profile",
+        "JSON style and compression for uploaded spoilers.",
+        choices=[
+            lightbulb.Choice("Pretty JSON", "pretty"),
+            lightbulb.Choice("Compact JSON", "compact"),
+            lightbulb.Choice("Pretty JSON, gzip", "pretty+gzip"),
+            lightbulb.Choice("Compact JSON, gzip", "compact+gzip"),
+            lightbulb.Choice("Compact JSON, zstd (gzip if unavailable)", "compact+zstd"),
+        ],
+    )
+
+    @lightbulb.invoke
+    async def invoke(self, ctx: lightbulb.Context) -> None:
+        ac.database_service.set_setting("spoiler_output_profile", self.profile)
+        await ctx.respond(f"Set spoiler output profile to `{self.profile}`.")
+
+@loader.command()
+class SpoilerSearch(
+    lightbulb.SlashCommand,
+    name="spoiler_search",
+    description="Find where an item was placed across past spoiler seeds.",
+):
+    item = lightbulb.string("item", "Item to search for, e.g. Hookshot or Moon Pearl.")
+    location = lightbulb.string(
+        "location",
+        "Only count locations whose name contains this text.",
+        default=None,
+    )
+    season = lightbulb.integer(
+        "season", "Only search seeds from this season.", default=None, min_value=1
+    )
+
+    @lightbulb.invoke
+    async def invoke(self, ctx: lightbulb.Context) -> None:
+        if ac.spoiler_index_service is None:
+            await ctx.respond("The spoiler index is not available.", ephemeral=True)
+            return
+
+        seed_count = ac.spoiler_index_service.seed_count(self.season)
+        counts = ac.spoiler_index_service.location_counts(
+            self.item, season=self.season, location=self.location, limit=15
+        )
+        scope = f"season {self.season}" if self.season else "all seasons"
+        if not counts:
+            await ctx.respond(
+                f"No placements of `{self.item}` found in {seed_count} indexed seeds ({scope})."
+            )
+            return
+
+        lines = [
+            f"- {count.section} / {count.location}: {count.count} ({count.count / seed_count:.1%})"
+            for count in counts
+        ]
+        await ctx.respond(
+            f"**{self.item}** across {seed_count} seeds ({scope}):\n" + "\n".join(lines)
+        )
+
 @loader.command()
 class SetGrabbagDecayPercentage(
     lightbulb.SlashCommand,
@@ -14,6 +14,15 @@ from apscheduler.triggers.date import DateTrigger
 
 WELCOME_MESSAGE = "Welcome to this Step Ladder race!"
 
+# Scheduler jobs around which new rooms appear: rooms are opened by open_race_* and
+# ladder races partition into new rooms when force_start_* starts them.
+ROOM_EVENT_JOBS = ("open_race_", "force_start_")
+# Refresh the category quickly from this long before a room event until this long after
+ROOM_EVENT_BEFORE = datetime.timedelta(minutes=1)
+ROOM_EVENT_AFTER = datetime.timedelta(minutes=3)
+# How often the scheduled room events are read from the job store
+ROOM_EVENTS_CHECK_EVERY = datetime.timedelta(minutes=1)
+
 utc = zoneinfo.ZoneInfo("UTC")
 est = zoneinfo.ZoneInfo("US/Eastern")
 
@@ -149,12 +158,27 @@ class RacetimeService(ExtendedRacetimeBot):
     Service for interacting with Racetime.gg.
     """
 
-    def __init__(self, category_slug, client_id, client_secret, local_instance=False):
+    def __init__(
+        self,
+        category_slug,
+        client_id,
+        client_secret,
+        local_instance=False,
+        max_finished_races=500,
+    ):
         bot_logger = logging.getLogger("racetime_bot")
         if local_instance:
             self.racetime_host = "localhost:8000"
             self.racetime_secure = False
-        super().__init__(category_slug, client_id, client_secret, bot_logger)
+        super().__init__(
+            category_slug,
+            client_id,
+            client_secret,
+            bot_logger,
+            max_finished_races=max_finished_races,
+        )
+        self._room_events: list[datetime.datetime] = []
+        self._room_events_checked: datetime.datetime = None
 
         self.logger.info(
             "RacetimeService initialized with category slug: %s", category_slug
@@ -163,6 +187,56 @@ class RacetimeService(ExtendedRacetimeBot):
     def get_handler_class(self):
         return LadderRaceHandler
 
+    def room_events(self, now: datetime.datetime) -> list[datetime.datetime]:
+        """
+        Times (UTC) around which rooms are expected to open or partition, from the
+        scheduled jobs. Jobs leave the job store once they have run, so recent events
+        are kept until their refresh window has passed.
+        """
+        if ac.scheduler_service is None:
+            return self._room_events
+        if (
+            self._room_events_checked is None
+            or now - self._room_events_checked >= ROOM_EVENTS_CHECK_EVERY
+        ):
+            try:
+                jobs = ac.scheduler_service.scheduler.get_jobs()
+            except Exception as e:
+                self.logger.warning(f"Could not read scheduled jobs: {e}")
+                jobs = []
+            events = {
+                job.next_run_time
+                for job in jobs
+                if job.id.startswith(ROOM_EVENT_JOBS) and job.next_run_time
+            }
+            events.update(
+                e for e in self._room_events if e <= now <= e + ROOM_EVENT_AFTER
+            )
+            self._room_events = sorted(events)
+            self._room_events_checked = now
+        return self._room_events
+
+    def refresh_interval(self) -> float:
+        """
+        Refresh every refresh_fast_every seconds around scheduled room opens and
+        partitions, every scan_races_every seconds while rooms are open, and every
+        refresh_idle_every seconds otherwise, waking up in time for the next event.
+        """
+        now = datetime.datetime.now(utc)
+        upcoming = None
+        for event in self.room_events(now):
+            if event - ROOM_EVENT_BEFORE <= now <= event + ROOM_EVENT_AFTER:
+                return self.refresh_fast_every
+            if event > now:
+                upcoming = event
+                break
+
+        interval = self.scan_races_every if self.handlers else self.refresh_idle_every
+        if upcoming is not None:
+            until_window = (upcoming - ROOM_EVENT_BEFORE - now).total_seconds()
+            interval = min(interval, max(until_window, self.refresh_fast_every))
+        return interval
+
     def start(self):
         """
         Start the Racetime service.
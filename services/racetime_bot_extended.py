@@ -1,5 +1,9 @@
 import asyncio
+from collections import OrderedDict
+from dataclasses import dataclass
+import datetime
 from functools import partial
+import hashlib
 import json
 from racetime_bot import Bot
 import aiohttp
@@ -8,13 +12,57 @@ import tenacity
 import app_context as ac
 
 
+@dataclass(slots=True)
+class FinishedRace:
+    """What is kept of a race room once its handler has finished."""
+
+    name: str
+    status: str | None
+    ended_at: datetime.datetime
+
+
 class ExtendedRacetimeBot(Bot):
     """
     Extended Racetime Bot with additional functionality.
+
+    HTTP requests to rt.gg share one aiohttp session, so refreshes reuse kept-alive
+    connections instead of opening a new TLS connection per request.
+
+    handler_objects only holds handlers that are still connected to their room. When a
+    race finishes or is cancelled its handler, race data and bot state are released and
+    a FinishedRace is kept instead, for at most max_finished_races rooms.
     """
 
-    def __init__(self, category_slug, client_id, client_secret, logger):
+    # Race detail fetches running at once during a refresh
+    race_fetch_concurrency = 8
+    # Seconds between category refreshes when a room is about to appear, and when
+    # nothing is going on. See refresh_interval.
+    refresh_fast_every = 5
+    refresh_idle_every = 120
+
+    def __init__(
+        self,
+        category_slug,
+        client_id,
+        client_secret,
+        logger,
+        max_finished_races: int | None = 500,
+    ):
         self.handler_objects = {}
+        # Least recently finished first, None keeps every finished race
+        self.finished_races: OrderedDict[str, FinishedRace] = OrderedDict()
+        self.max_finished_races = max_finished_races
+        self.handlers_created = 0
+        self._session: aiohttp.ClientSession = None
+        self._race_fetch_slots = asyncio.Semaphore(self.race_fetch_concurrency)
+        self._refresh_wake = asyncio.Event()
+        # One future per caller waiting on a room's handler, see wait_for_handler
+        self._handler_waiters: dict[str, set[asyncio.Future]] = {}
+        # ETag and hash of the last category data, to skip it when it has not changed
+        self._category_etag: str = None
+        self._category_digest: bytes = None
+        # Rooms not handled by configuration, with the summary they were ignored at
+        self._ignored_races: dict[str, dict] = {}
 
         super().__init__(category_slug, client_id, client_secret, logger)
 
@@ -30,9 +78,75 @@ class ExtendedRacetimeBot(Bot):
         """
         handler = super().create_handler(race_data)
         self.handler_objects[race_data.get("name")] = handler
+        self.finished_races.pop(race_data.get("name"), None)
+        self.handlers_created += 1
         self.logger.info(f"Handler created and stored for {race_data.get('name')}")
+        self._resolve_waiters(race_data.get("name"), handler)
         return handler
 
+    def _resolve_waiters(self, room_name: str, handler):
+        """Hand a room's handler, or None if it will not get one, to everyone waiting."""
+        for waiter in self._handler_waiters.pop(room_name, ()):
+            if not waiter.done():
+                waiter.set_result(handler)
+
+    async def wait_for_handler(self, room_name: str, timeout: float = 60):
+        """
+        Return the handler for a room, waiting up to timeout seconds for it to be
+        created. The first caller to wait on a room triggers a fetch of just that room
+        instead of waiting for the next category refresh. Returns None if no handler
+        appeared in time or the room is not handled.
+        """
+        room_name = room_name.lstrip("/")
+        if room_name in self.handlers and room_name in self.handler_objects:
+            return self.handler_objects[room_name]
+        if room_name in self.finished_races:
+            self.logger.warning(f"Room {room_name} has already finished")
+            return None
+
+        waiters = self._handler_waiters.setdefault(room_name, set())
+        if not waiters:
+            self.loop.create_task(self._attach_room(room_name))
+        waiter = self.loop.create_future()
+        waiters.add(waiter)
+        try:
+            return await asyncio.wait_for(waiter, timeout)
+        except TimeoutError:
+            self.logger.error(f"No handler for room {room_name} after {timeout}s")
+            return None
+        finally:
+            # Once nobody waits on the room, the next caller fetches it again
+            waiters.discard(waiter)
+            if not waiters and self._handler_waiters.get(room_name) is waiters:
+                del self._handler_waiters[room_name]
+
+    async def _attach_room(self, room_name: str):
+        """Fetch one room and start handling it, if it is not handled already."""
+        race_data = await self._fetch_race_data(room_name, f"/{room_name}/data")
+        if race_data is None:
+            # Leave it to the next category refresh, now rather than later
+            self.wake_refresh()
+            return
+        self._handle_race(room_name, race_data, self.races.get(room_name))
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Created lazily, a ClientSession has to be made inside the running event loop.
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.race_fetch_concurrency,
+                    keepalive_timeout=60,
+                    ttl_dns_cache=300,
+                ),
+                timeout=aiohttp.ClientTimeout(total=30, connect=10),
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
     def get_raceroom_url(self, room_name):
         if not room_name.startswith("/"):
             room_name = f"/{room_name}"
@@ -51,9 +165,8 @@ class ExtendedRacetimeBot(Bot):
             ):
                 with attempt:
                     self.logger.debug("Attempting to open rt.gg room...")
-                    async with aiohttp.request(
-                        method="POST",
-                        url=self.http_uri(f"/o/{self.category_slug}/startrace"),
+                    async with self._get_session().post(
+                        self.http_uri(f"/o/{self.category_slug}/startrace"),
                         data=kwargs,
                         headers={"Authorization": f"Bearer {self.access_token}"},
                     ) as response:
@@ -72,12 +185,54 @@ class ExtendedRacetimeBot(Bot):
 
         if "Location" in headers:
             room = headers["Location"][1:]
+            # Pick the new room up now rather than on the next scheduled refresh
+            self.wake_refresh()
             return room
 
         raise Exception(
             "Failed to open rt.gg room, no Location header found in response."
         )
     
+    def refresh_interval(self) -> float:
+        """
+        Seconds until the next category refresh. Override to refresh more often when
+        rooms are expected to appear.
+        """
+        return self.scan_races_every
+
+    def wake_refresh(self):
+        """Refresh the category now instead of waiting for the next interval."""
+        self._refresh_wake.set()
+
+    async def _wait_for_refresh(self):
+        try:
+            await asyncio.wait_for(
+                self._refresh_wake.wait(), timeout=self.refresh_interval()
+            )
+        except TimeoutError:
+            pass
+        self._refresh_wake.clear()
+
+    async def _fetch_category_data(self) -> bytes | None:
+        """Fetch the category data, or None if it has not changed since last time."""
+        headers = {"Authorization": f"Bearer {self.access_token}"}
+        if self._category_etag:
+            headers["If-None-Match"] = self._category_etag
+        async with self._get_session().get(
+            self.http_uri(f"/o/{self.category_slug}/data"),
+            raise_for_status=True,
+            headers=headers,
+        ) as resp:
+            if resp.status == 304:
+                return None
+            self._category_etag = resp.headers.get("ETag")
+            body = await resp.read()
+        digest = hashlib.sha1(body).digest()
+        if digest == self._category_digest:
+            return None
+        self._category_digest = digest
+        return body
+
     # Override default refresh to gain access to unlisted rooms
     async def refresh_races(self):
         """
@@ -85,60 +240,124 @@ class ExtendedRacetimeBot(Bot):
         endpoint, retrieving the current race list. Creates a handler and task
         for any race that should be handled but currently isn't.
 
-        This method runs in a constant loop, checking for new races every few
-        seconds.
+        This method runs in a constant loop, checking for new races as often as
+        refresh_interval says. Unchanged category data is not parsed again, and
+        rooms ignored by configuration are only looked at again once their
+        summary changes.
         """
 
-        def done(task_name, *args):
-            del self.handlers[task_name]
-
         while True:
-            self.logger.info("Refresh races")
+            self.logger.debug("Refresh races")
             try:
-                async with aiohttp.request(
-                    method="get",
-                    url=self.http_uri(f"/o/{self.category_slug}/data"),
-                    raise_for_status=True,
-                    headers={"Authorization": f"Bearer {self.access_token}"},
-                ) as resp:
-                    data = json.loads(await resp.read())
+                body = await self._fetch_category_data()
             except Exception:
                 self.logger.error(
                     "Fatal error when attempting to retrieve race data.", exc_info=True
                 )
                 await asyncio.sleep(self.scan_races_every)
                 continue
-            self.races = {}
-            for race in data.get("current_races", []):
-                self.races[race.get("name")] = race
-
-            for name, summary_data in self.races.items():
-                if name not in self.handlers:
-                    try:
-                        async with aiohttp.request(
-                            method="get",
-                            url=self.http_uri(summary_data.get("data_url")),
-                            raise_for_status=True,
-                            headers={"Authorization": f"Bearer {self.access_token}"},
-                        ) as resp:
-                            race_data = json.loads(await resp.read())
-                    except Exception:
-                        self.logger.error(
-                            "Fatal error when attempting to retrieve summary data.",
-                            exc_info=True,
-                        )
-                        await asyncio.sleep(self.scan_races_every)
-                        continue
-                    if self.should_handle(race_data):
-                        handler = self.create_handler(race_data)
-                        self.handlers[name] = self.loop.create_task(handler.handle())
-                        self.handlers[name].add_done_callback(partial(done, name))
-                    else:
-                        if name in self.state:
-                            del self.state[name]
-                        self.logger.info(
-                            "Ignoring %(race)s by configuration."
-                            % {"race": race_data.get("name")}
-                        )
-
-            await asyncio.sleep(self.scan_races_every)
+            if body is not None:
+                data = json.loads(body)
+                self.races = {}
+                for race in data.get("current_races", []):
+                    self.races[race.get("name")] = race
+                self._ignored_races = {
+                    name: summary
+                    for name, summary in self._ignored_races.items()
+                    if name in self.races
+                }
+
+            # Fetch the details of every new room at once, a room that fails is
+            # retried on the next refresh without holding up the others
+            new_races = [
+                (name, summary_data)
+                for name, summary_data in self.races.items()
+                if name not in self.handlers
+                and self._ignored_races.get(name) != summary_data
+            ]
+            race_details = await asyncio.gather(
+                *(
+                    self._fetch_race_data(name, summary_data.get("data_url"))
+                    for name, summary_data in new_races
+                )
+            )
+
+            for (name, summary_data), race_data in zip(new_races, race_details):
+                if race_data is not None:
+                    self._handle_race(name, race_data, summary_data)
+
+            await self._wait_for_refresh()
+
+    def _handle_race(self, name: str, race_data: dict, summary_data: dict = None):
+        """Create a handler and task for a race, unless it is handled already or ignored."""
+        if name in self.handlers:
+            return
+        if self.should_handle(race_data):
+            self._ignored_races.pop(name, None)
+            handler = self.create_handler(race_data)
+            self.handlers[name] = self.loop.create_task(handler.handle())
+            self.handlers[name].add_done_callback(partial(self._handler_done, name))
+        else:
+            if summary_data is not None:
+                self._ignored_races[name] = summary_data
+            if name in self.state:
+                del self.state[name]
+            # Finished or cancelled rooms among them, e.g. while the bot was restarting
+            self._resolve_waiters(name, None)
+            self.logger.info(
+                "Ignoring %(race)s by configuration."
+                % {"race": race_data.get("name")}
+            )
+
+    def _handler_done(self, name: str, *args):
+        del self.handlers[name]
+        handler = self.handler_objects.pop(name, None)
+        if handler is None:
+            return
+        status = handler.data.get("status", {}).get("value")
+        if status not in handler.stop_at:
+            # Disconnected mid-race, the next refresh reconnects and keeps the state
+            self.logger.warning(f"Handler for {name} stopped while the race is {status}")
+            return
+
+        self.state.pop(name, None)
+        self.finished_races[name] = FinishedRace(
+            name=name,
+            status=status,
+            ended_at=datetime.datetime.now(datetime.UTC),
+        )
+        if self.max_finished_races is not None:
+            while len(self.finished_races) > self.max_finished_races:
+                self.finished_races.popitem(last=False)
+        self._resolve_waiters(name, None)
+        self.logger.info(f"Released handler for {status} race {name}")
+
+    def handler_metrics(self) -> dict:
+        """Counts of race handlers and what is retained for finished rooms."""
+        return {
+            "live_handlers": len(self.handler_objects),
+            "handler_tasks": len(self.handlers),
+            "handlers_created": self.handlers_created,
+            "finished_races": len(self.finished_races),
+            "max_finished_races": self.max_finished_races,
+            "race_states": len(self.state),
+            "ignored_races": len(self._ignored_races),
+            "handler_waiters": len(self._handler_waiters),
+        }
+
+    async def _fetch_race_data(self, name: str, data_url: str) -> dict | None:
+        """Fetch a race's detail data, or None if it could not be retrieved."""
+        try:
+            async with self._race_fetch_slots:
+                async with self._get_session().get(
+                    self.http_uri(data_url),
+                    raise_for_status=True,
+                    headers={"Authorization": f"Bearer {self.access_token}"},
+                ) as resp:
+                    return json.loads(await resp.read())
+        except Exception:
+            self.logger.error(
+                f"Fatal error when attempting to retrieve summary data for {name}.",
+                exc_info=True,
+            )
+            return None
@@ -1,28 +1,150 @@
+import asyncio
+import functools
+import io
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+from botocore.exceptions import ClientError
+
+MB = 1024 * 1024
+
+logger = logging.getLogger(__name__)
 
 
 class S3Service:
-    def __init__(self, endpoint_url, access_key, secret_key, bucket_name):
+    """
+    Async facade over a single shared boto3 client.
+
+    boto3 is blocking, so every call runs on a small dedicated thread pool and the
+    public methods are awaitable. This keeps uploads off the event loop, where they
+    would otherwise stall Discord heartbeats, racetime websockets and scheduled jobs.
+    """
+
+    def __init__(
+        self,
+        endpoint_url,
+        access_key,
+        secret_key,
+        bucket_name,
+        max_workers: int = 4,
+        multipart_threshold: int = 16 * MB,
+        multipart_chunksize: int = 8 * MB,
+        max_concurrency: int = 4,
+    ):
+        # Each upload may run max_concurrency part uploads at once, size the pool to match.
         self.s3_client = boto3.client(
             "s3",
             endpoint_url=endpoint_url,
             aws_access_key_id=access_key,
             aws_secret_access_key=secret_key,
+            config=Config(
+                max_pool_connections=max_workers * max_concurrency,
+                retries={"max_attempts": 5, "mode": "standard"},
+                connect_timeout=10,
+                read_timeout=60,
+            ),
         )
         self.bucket_name = bucket_name
+        # Spoilers are well below the threshold and go up in a single PUT; larger
+        # objects are split into parts uploaded in parallel.
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=max_concurrency,
+            use_threads=max_concurrency > 1,
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="s3"
+        )
 
-    def upload_file(self, file_path, object_name):
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def _extra_args(self, object_name, content_encoding=None, cache_control=None):
+        # ExtraArgs to force download in the browser instead of opening in a new tab
+        extra_args = {
+            'ContentType': 'application/octet-stream',
+            'ContentDisposition': f'attachment; filename="{object_name}"'
+        }
+        if content_encoding:
+            extra_args['ContentEncoding'] = content_encoding
+        if cache_control:
+            extra_args['CacheControl'] = cache_control
+        return extra_args
+
+    def _get_object_etag(self, object_name):
+        try:
+            response = self.s3_client.head_object(Bucket=self.bucket_name, Key=object_name)
+            return response.get("ETag")
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                logger.error(f"Error checking S3 object {object_name}: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Error checking S3 object {object_name}: {e}")
+            return None
+
+    def _upload_file(self, file_path, object_name, content_encoding=None, cache_control=None):
         try:
             self.s3_client.upload_file(
-                file_path, 
-                self.bucket_name, 
+                file_path,
+                self.bucket_name,
+                object_name,
+                ExtraArgs=self._extra_args(
+                    object_name, content_encoding, cache_control
+                ),
+                Config=self.transfer_config,
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Error uploading file to S3: {e}")
+            return False
+
+    def _upload_bytes(self, data, object_name, content_encoding=None, cache_control=None):
+        try:
+            self.s3_client.upload_fileobj(
+                io.BytesIO(data),
+                self.bucket_name,
                 object_name,
-                # ExtraArgs to force download in the browser instead of opening in a new tab
-                ExtraArgs= {
-                    'ContentType': 'application/octet-stream',
-                    'ContentDisposition': f'attachment; filename="{object_name}"'
-                })
+                ExtraArgs=self._extra_args(
+                    object_name, content_encoding, cache_control
+                ),
+                Config=self.transfer_config,
+            )
             return True
         except Exception as e:
-            print(f"Error uploading file to S3: {e}")
+            logger.error(f"Error uploading bytes to S3: {e}")
             return False
+
+    async def get_object_etag(self, object_name):
+        """
+        HEAD an object. Returns its ETag, or None if it does not exist or the check failed.
+        """
+        return await self._run(self._get_object_etag, object_name)
+
+    async def upload_file(
+        self, file_path, object_name, content_encoding=None, cache_control=None
+    ):
+        return await self._run(
+            self._upload_file, file_path, object_name, content_encoding, cache_control
+        )
+
+    async def upload_bytes(
+        self, data: bytes, object_name, content_encoding=None, cache_control=None
+    ):
+        """
+        Upload an in-memory object, streaming straight from the buffer.
+        content_encoding should be set when data is pre-compressed (e.g. "gzip").
+        """
+        return await self._run(
+            self._upload_bytes, data, object_name, content_encoding, cache_control
+        )
@@ -0,0 +1,321 @@
+import argparse
+import logging
+import re
+import sqlite3
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+logger = logging.getLogger("spoiler_index")
+
+# Top-level sections of a transformed spoiler that do not hold placements.
+SKIPPED_SECTIONS = {"meta"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS strings (
+    id INTEGER PRIMARY KEY,
+    value TEXT NOT NULL UNIQUE,
+    key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS strings_key ON strings (key);
+CREATE TABLE IF NOT EXISTS seeds (
+    id INTEGER PRIMARY KEY,
+    seed TEXT NOT NULL UNIQUE,
+    season INTEGER,
+    race_id INTEGER,
+    revealed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS seeds_season ON seeds (season, revealed_at);
+CREATE TABLE IF NOT EXISTS placements (
+    item INTEGER NOT NULL,
+    seed INTEGER NOT NULL,
+    section INTEGER NOT NULL,
+    location INTEGER NOT NULL,
+    PRIMARY KEY (item, seed, section, location)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS placements_location ON placements (location, item);
+CREATE INDEX IF NOT EXISTS placements_seed ON placements (seed);
+"""
+
+_SPOILER_NAME_RE = re.compile(r"^Spoiler_StepLadder_([^_]+)_")
+
+
+def normalize(value: str) -> str:
+    """Lookup key for names: "Moon Pearl", "moonpearl" and "MoonPearl" all match."""
+    return re.sub(r"[^0-9a-z]", "", value.lower())
+
+
+def iter_placements(spoiler: dict):
+    """
+    Yield (section, location, item) for every string leaf of a transformed spoiler.
+    Nested sections (Drops, Entrances) use their sub-keys joined with " - " as the location.
+    """
+    for section, body in spoiler.items():
+        if section in SKIPPED_SECTIONS or not isinstance(body, dict):
+            continue
+        stack = [((), body)]
+        while stack:
+            path, node = stack.pop()
+            for key, value in node.items():
+                if isinstance(value, dict):
+                    stack.append((path + (key,), value))
+                elif isinstance(value, str):
+                    yield section, " - ".join(path + (key,)), value
+
+
+@dataclass
+class Placement:
+    seed: str
+    season: int | None
+    section: str
+    location: str
+    item: str
+
+
+@dataclass
+class LocationCount:
+    section: str
+    location: str
+    count: int
+
+
+class SpoilerIndexService:
+    """
+    Inverted index of item -> (seed, section, location) over transformed spoilers,
+    kept in a SQLite sidecar so season-wide queries never touch the JSON in S3.
+
+    Seeds are hidden from queries until their revealed_at time, so a spoiler uploaded
+    before its race starts cannot be searched early.
+    """
+
+    def __init__(self, db_path: str = "spoiler_index.sqlite3"):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._string_ids: dict[str, int] = {}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def _string_id(self, value: str) -> int:
+        string_id = self._string_ids.get(value)
+        if string_id is None:
+            self._conn.execute(
+                "INSERT OR IGNORE INTO strings (value, key) VALUES (?, ?)",
+                (value, normalize(value)),
+            )
+            string_id = self._conn.execute(
+                "SELECT id FROM strings WHERE value = ?", (value,)
+            ).fetchone()[0]
+            self._string_ids[value] = string_id
+        return string_id
+
+    def index_spoiler(
+        self,
+        seed: str,
+        spoiler: dict,
+        season: int | None = None,
+        race_id: int | None = None,
+        revealed_at: float | None = None,
+    ) -> int:
+        """
+        Index a transformed spoiler, replacing any earlier entry for the same seed.
+        Returns the number of placements stored.
+        """
+        with self._lock:
+            try:
+                with self._conn:
+                    return self._replace_seed(
+                        seed, spoiler, season, race_id, revealed_at
+                    )
+            except sqlite3.Error:
+                # Ids cached during a rolled back transaction no longer exist.
+                self._string_ids.clear()
+                raise
+
+    def _replace_seed(self, seed, spoiler, season, race_id, revealed_at) -> int:
+        self._conn.execute(
+            "INSERT INTO seeds (seed, season, race_id, revealed_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT (seed) DO UPDATE SET season = excluded.season, "
+            "race_id = excluded.race_id, revealed_at = excluded.revealed_at",
+            (seed, season, race_id, revealed_at if revealed_at is not None else 0.0),
+        )
+        seed_id = self._conn.execute(
+            "SELECT id FROM seeds WHERE seed = ?", (seed,)
+        ).fetchone()[0]
+        self._conn.execute("DELETE FROM placements WHERE seed = ?", (seed_id,))
+        rows = {
+            (
+                self._string_id(item),
+                seed_id,
+                self._string_id(section),
+                self._string_id(location),
+            )
+            for section, location, item in iter_placements(spoiler)
+        }
+        self._conn.executemany(
+            "INSERT INTO placements (item, seed, section, location) VALUES (?, ?, ?, ?)",
+            rows,
+        )
+        return len(rows)
+
+    def remove_seed(self, seed: str) -> bool:
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT id FROM seeds WHERE seed = ?", (seed,)
+            ).fetchone()
+            if row is None:
+                return False
+            self._conn.execute("DELETE FROM placements WHERE seed = ?", (row[0],))
+            self._conn.execute("DELETE FROM seeds WHERE id = ?", (row[0],))
+            return True
+
+    def _visible_seeds(self, season: int | None) -> tuple[str, list]:
+        clause = "seeds.revealed_at <= ?"
+        params: list = [time.time()]
+        if season is not None:
+            clause += " AND seeds.season = ?"
+            params.append(season)
+        return clause, params
+
+    def seed_count(self, season: int | None = None) -> int:
+        """Number of searchable seeds, the denominator for frequency questions."""
+        clause, params = self._visible_seeds(season)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM seeds WHERE {clause}", params
+            ).fetchone()[0]
+
+    def find_item(
+        self,
+        item: str,
+        season: int | None = None,
+        location: str | None = None,
+        limit: int | None = None,
+    ) -> list[Placement]:
+        """
+        Every placement of item, newest seed first. location filters on a
+        case-insensitive substring of the location name.
+        """
+        clause, params = self._visible_seeds(season)
+        sql = (
+            "SELECT seeds.seed, seeds.season, s.value, l.value, i.value "
+            "FROM strings i "
+            "JOIN placements p ON p.item = i.id "
+            "JOIN seeds ON seeds.id = p.seed "
+            "JOIN strings s ON s.id = p.section "
+            "JOIN strings l ON l.id = p.location "
+            f"WHERE i.key = ? AND {clause}"
+        )
+        params = [normalize(item), *params]
+        if location:
+            sql += " AND l.key LIKE ?"
+            params.append(f"%{normalize(location)}%")
+        sql += " ORDER BY seeds.revealed_at DESC, seeds.id DESC, s.value, l.value"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [Placement(*row) for row in self._conn.execute(sql, params)]
+
+    def location_counts(
+        self,
+        item: str,
+        season: int | None = None,
+        location: str | None = None,
+        limit: int | None = None,
+    ) -> list[LocationCount]:
+        """How many seeds had item at each location, most common first."""
+        clause, params = self._visible_seeds(season)
+        sql = (
+            "SELECT s.value, l.value, COUNT(DISTINCT p.seed) AS n "
+            "FROM strings i "
+            "JOIN placements p ON p.item = i.id "
+            "JOIN seeds ON seeds.id = p.seed "
+            "JOIN strings s ON s.id = p.section "
+            "JOIN strings l ON l.id = p.location "
+            f"WHERE i.key = ? AND {clause}"
+        )
+        params = [normalize(item), *params]
+        if location:
+            sql += " AND l.key LIKE ?"
+            params.append(f"%{normalize(location)}%")
+        sql += " GROUP BY p.section, p.location ORDER BY n DESC, s.value, l.value"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            return [LocationCount(*row) for row in self._conn.execute(sql, params)]
+
+
+# Transformed spoilers as written by the converter's output profiles
+SPOILER_FILE_SUFFIXES = (".json", ".json.gz", ".json.zst")
+
+
+def _read_spoiler_file(path: Path) -> dict:
+    if not path.name.endswith(SPOILER_FILE_SUFFIXES):
+        raise ValueError(
+            f"not a spoiler file, expected one of {', '.join(SPOILER_FILE_SUFFIXES)}"
+        )
+    # Imported here, the converter is only needed by the backfill
+    import spoiler_converter
+
+    return spoiler_converter.decode(path.read_bytes())
+
+
+def _seed_name(path: Path) -> str:
+    name = path.name.removesuffix(".gz").removesuffix(".zst").removesuffix(".json")
+    match = _SPOILER_NAME_RE.match(name)
+    return match.group(1) if match else name
+
+
+def _cli(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Backfill the spoiler search index from transformed spoiler files."
+    )
+    parser.add_argument(
+        "paths", nargs="+", help="Transformed spoiler files or directories of them"
+    )
+    parser.add_argument("--db", default="spoiler_index.sqlite3")
+    parser.add_argument("--season", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    files: list[Path] = []
+    for raw in args.paths:
+        path = Path(raw)
+        if path.is_dir():
+            files.extend(
+                sorted(
+                    p for p in path.iterdir() if p.name.endswith(SPOILER_FILE_SUFFIXES)
+                )
+            )
+        else:
+            files.append(path)
+
+    index = SpoilerIndexService(args.db)
+    failures = 0
+    start = time.perf_counter()
+    for path in files:
+        try:
+            count = index.index_spoiler(
+                _seed_name(path), _read_spoiler_file(path), season=args.season
+            )
+            print(f"{path.name}: {count} placements")
+        except (OSError, ValueError) as e:
+            failures += 1
+            print(f"{path.name}: failed ({e})", file=sys.stderr)
+    index.close()
+    print(
+        f"Indexed {len(files) - failures} spoiler(s) in {time.perf_counter() - start:.2f}s"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(_cli())
@@ -0,0 +1,213 @@
+import asyncio
+import datetime
+import logging
+import os
+import random
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import app_context as ac
+import models
+import schemas
+
+
+def utcnow() -> datetime.datetime:
+    """Naive UTC, the format stored in the spoilerUploads table."""
+    return datetime.datetime.now(datetime.UTC).replace(tzinfo=None)
+
+
+class SpoilerUploadQueue:
+    """
+    Durable retry queue for spoiler uploads that failed on the first try.
+
+    The body is written to a local spool directory and tracked in the spoilerUploads
+    table, so pending uploads survive restarts. Background workers retry each one with
+    exponential backoff until S3 accepts it, then call on_uploaded with the row.
+    """
+
+    def __init__(
+        self,
+        spool_dir: str = "spool/spoilers",
+        on_uploaded: Callable[[models.SpoilerUpload], Awaitable[None]] = None,
+        workers: int = 2,
+        base_delay: float = 15,
+        max_delay: float = 1800,
+        alert_after: int = 5,
+    ):
+        self.spool_dir = Path(spool_dir)
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        self.on_uploaded = on_uploaded
+        self.workers = workers
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.alert_after = alert_after
+        self.logger = logging.getLogger("SpoilerUploadQueue")
+
+        self._pending: dict[int, models.SpoilerUpload] = {}
+        self._in_flight: set[int] = set()
+        self._queue: asyncio.Queue[int] = asyncio.Queue()
+        self._wake = asyncio.Event()
+        self._tasks: list[asyncio.Task] = []
+
+    async def start(self):
+        """Load uploads left pending by a previous run and start the workers."""
+        for upload in ac.database_service.get_pending_spoiler_uploads():
+            self._pending[upload.id] = upload
+        if self._pending:
+            self.logger.info(f"Resuming {len(self._pending)} pending spoiler upload(s).")
+
+        self._tasks.append(asyncio.create_task(self._dispatch()))
+        for _ in range(self.workers):
+            self._tasks.append(asyncio.create_task(self._worker()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def has_pending(self, race_id: int) -> bool:
+        return any(upload.raceId == race_id for upload in self._pending.values())
+
+    def _backoff(self, attempts: int) -> float:
+        delay = min(self.max_delay, self.base_delay * 2 ** max(attempts - 1, 0))
+        return delay * random.uniform(0.8, 1.2)
+
+    @staticmethod
+    def _write_spool(path: Path, body: bytes):
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    async def enqueue(
+        self,
+        object_name: str,
+        body: bytes,
+        content_encoding: str = None,
+        cache_control: str = None,
+        race_id: int = None,
+    ) -> int | None:
+        """
+        Spool an upload for retry. Returns the queue entry ID, or None if it could not be
+        spooled.
+        """
+        for upload in self._pending.values():
+            if upload.objectName == object_name:
+                return upload.id
+
+        spool_path = self.spool_dir / object_name
+        try:
+            await asyncio.to_thread(self._write_spool, spool_path, body)
+            now = utcnow()
+            upload = ac.database_service.add_spoiler_upload(
+                schemas.SpoilerUploadWrite(
+                    objectName=object_name,
+                    spoolPath=str(spool_path),
+                    contentEncoding=content_encoding,
+                    cacheControl=cache_control,
+                    raceId=race_id,
+                    nextAttempt=now + datetime.timedelta(seconds=self._backoff(0)),
+                    created=now,
+                )
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to queue spoiler upload {object_name}: {e}")
+            return None
+
+        self._pending[upload.id] = upload
+        self._wake.set()
+        self.logger.info(f"Queued spoiler upload {object_name} for retry (ID {upload.id}).")
+        return upload.id
+
+    async def _dispatch(self):
+        """Hand due uploads to the workers, sleeping until the next one is due."""
+        while True:
+            now = utcnow()
+            next_due = None
+            for upload in self._pending.values():
+                if upload.id in self._in_flight:
+                    continue
+                if upload.nextAttempt <= now:
+                    self._in_flight.add(upload.id)
+                    self._queue.put_nowait(upload.id)
+                elif next_due is None or upload.nextAttempt < next_due:
+                    next_due = upload.nextAttempt
+
+            timeout = 60.0
+            if next_due is not None:
+                timeout = min(timeout, max(0.5, (next_due - now).total_seconds()))
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+            except TimeoutError:
+                pass
+
+    async def _worker(self):
+        while True:
+            upload_id = await self._queue.get()
+            try:
+                upload = self._pending.get(upload_id)
+                if upload is not None:
+                    await self._attempt(upload)
+            except Exception as e:
+                self.logger.error(f"Error processing spoiler upload {upload_id}: {e}")
+            finally:
+                self._in_flight.discard(upload_id)
+                self._queue.task_done()
+                self._wake.set()
+
+    async def _attempt(self, upload: models.SpoilerUpload):
+        spool_path = Path(upload.spoolPath)
+        if not spool_path.exists():
+            self.logger.error(f"Spool file {spool_path} is missing, giving up on {upload.objectName}.")
+            ac.database_service.update_spoiler_upload(
+                upload.id, "failed", last_error="Spool file missing"
+            )
+            self._pending.pop(upload.id, None)
+            await self._alert(f"Gave up on spoiler upload {upload.objectName}, its spool file is missing!")
+            return
+
+        uploaded = await ac.s3_service.upload_file(
+            str(spool_path),
+            upload.objectName,
+            content_encoding=upload.contentEncoding,
+            cache_control=upload.cacheControl,
+        )
+        if uploaded:
+            upload = ac.database_service.update_spoiler_upload(
+                upload.id, "uploaded", attempts=upload.attempts + 1, completed=utcnow()
+            ) or upload
+            self._pending.pop(upload.id, None)
+            spool_path.unlink(missing_ok=True)
+            self.logger.info(f"Spoiler file {upload.objectName} uploaded after {upload.attempts} retries.")
+            if self.on_uploaded is not None:
+                await self.on_uploaded(upload)
+            return
+
+        attempts = upload.attempts + 1
+        delay = self._backoff(attempts)
+        upload = ac.database_service.update_spoiler_upload(
+            upload.id,
+            "pending",
+            attempts=attempts,
+            next_attempt=utcnow() + datetime.timedelta(seconds=delay),
+            last_error="Upload failed",
+        ) or upload
+        self._pending[upload.id] = upload
+        self.logger.warning(
+            f"Retry {attempts} of spoiler upload {upload.objectName} failed, next try in {delay:.0f}s."
+        )
+        if attempts == self.alert_after:
+            await self._alert(
+                f"Spoiler upload {upload.objectName} has failed {attempts} times, still retrying."
+            )
+
+    async def _alert(self, message: str):
+        admin_role = ac.database_service.get_setting("admin_role_id")
+        admin_ping = f"<@&{admin_role}> " if admin_role else ""
+        await ac.discord_service.send_message(
+            content=f"{admin_ping}{message}", force_mention=True
+        )
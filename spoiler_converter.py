@@ -7,11 +7,28 @@ Design by Jem and telethar
 
 from __future__ import annotations
 
+import functools
+import glob
+import gzip
+import hashlib
 import json
+import os
 import re
 import sys
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Iterable
+from types import MappingProxyType
+from typing import Any, Iterable, Mapping
+
+try:  # Python 3.14+
+    from compression import zstd as _zstd
+except ImportError:
+    try:
+        import zstandard as _zstd
+    except ImportError:
+        _zstd = None
 
 from data.spoiler_data import (
     ITEM_NAMES_CONVERTER,
@@ -70,6 +87,13 @@ _TEMPLATES_PATH = Path(__file__).parent / "data" / "spoiler_orders.json"
 
 ENEMY_SUFFIX_RE = re.compile(r"\s*\([A-Za-z0-9]+\)$")
 
+# Substring match against any excluded name, in one scan.
+_ENTRANCE_EXCLUDE_RE = re.compile(
+    "|".join(re.escape(name) for name in ENTRANCE_LOCATIONS_EXCLUDE_LIST)
+)
+# Exact-name replacements take precedence over the @-location ones.
+_ENTRANCE_RENAMES = {**ENTRANCE_AT_NAME_REPLACEMENTS, **ENTRANCE_NAME_REPLACEMENTS}
+
 
 def _load_templates() -> dict:
     with open(_TEMPLATES_PATH, "r", encoding="utf-8") as f:
@@ -86,34 +110,85 @@ def _strip_enemy_suffix(key: str) -> str:
     return key
 
 
+class _RenameAutomaton:
+    """Aho-Corasick matcher over a rename table.
+
+    Patterns are ranked longest-first (ties keep table order), so one scan of a
+    key reports every rename present and the lowest rank is the one to apply.
+    """
+
+    def __init__(self, replacements: dict[str, str]):
+        self.patterns: list[tuple[str, str]] = sorted(
+            ((old, new) for old, new in replacements.items() if old != new),
+            key=lambda kv: -len(kv[0]),
+        )
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._out: list[tuple[int, ...]] = [()]
+
+        for rank, (old, _) in enumerate(self.patterns):
+            state = 0
+            for ch in old:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = nxt
+            self._out[state] += (rank,)
+
+        # Breadth-first fail links; outputs inherit from their fail state.
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] += self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    def matches(self, key: str) -> set[int]:
+        """Return the ranks of every pattern occurring in key."""
+        goto, fail, out = self._goto, self._fail, self._out
+        found: set[int] = set()
+        state = 0
+        for ch in key:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if out[state]:
+                found.update(out[state])
+        return found
+
+
+_LOCATION_RENAMER = _RenameAutomaton(LOCATION_NAME_REPLACEMENTS)
+
+
+@functools.lru_cache(maxsize=8192)
 def _apply_location_renames(key: str) -> str:
     """Apply renames iteratively (longest-first each pass)
     so cascading renames work, e.g. "Blinds Hideout (Top) Pot #2" ->
     "Blind's Hideout (Top) Pot #2" -> "Blind's Hideout - Top Pot #2".
+
+    Results are memoised, raw location keys repeat across every seed.
     """
     # Whole-key exception map first.
     if key in LOCATION_NAME_EXCEPTION_CONVERTER:
         key = LOCATION_NAME_EXCEPTION_CONVERTER[key]
 
-    sorted_prefixes = sorted(
-        LOCATION_NAME_REPLACEMENTS.items(), key=lambda kv: -len(kv[0])
-    )
-    applied: set[str] = set()
+    applied: set[int] = set()
     # Gate at 8 iterations to prevent infinite loops in case of a bug in the rename maps.
     for _ in range(8):
-        changed = False
-        for old_prefix, new_prefix in sorted_prefixes:
-            if old_prefix == new_prefix or old_prefix in applied:
-                continue
-            if old_prefix in key:
-                new_key = key.replace(old_prefix, new_prefix)
-                if new_key != key:
-                    key = new_key
-                    applied.add(old_prefix)
-                    changed = True
-                    break
-        if not changed:
+        pending = _LOCATION_RENAMER.matches(key) - applied
+        if not pending:
             break
+        rank = min(pending)
+        old_prefix, new_prefix = _LOCATION_RENAMER.patterns[rank]
+        key = key.replace(old_prefix, new_prefix)
+        applied.add(rank)
     return key
 
 
@@ -131,13 +206,13 @@ def _convert_item(value: str) -> str:
 
 def _build_template_index(
     templates: dict,
-) -> tuple[dict[str, str], dict[str, list[str]]]:
+) -> tuple[dict[str, str], dict[str, tuple[str, ...]]]:
     """Return (key_base -> section, section -> ordered keys)."""
     locations = templates["locations"]
     key_to_section: dict[str, str] = {}
-    section_order: dict[str, list[str]] = {}
+    section_order: dict[str, tuple[str, ...]] = {}
     for section in ALL_LOCATION_OUTPUT_SECTIONS:
-        ordered = locations.get(section, [])
+        ordered = tuple(locations.get(section, []))
         section_order[section] = ordered
         for k in ordered:
             key_to_section[k] = section
@@ -146,17 +221,88 @@ def _build_template_index(
 
 def _build_entrance_template_index(
     templates: dict,
-) -> tuple[dict[str, str], dict[str, list[str]]]:
+) -> tuple[dict[str, str], dict[str, tuple[str, ...]]]:
     entrances = templates["entrances"]
     key_to_category: dict[str, str] = {}
-    category_order: dict[str, list[str]] = {}
+    category_order: dict[str, tuple[str, ...]] = {}
     for category, keys in entrances.items():
-        category_order[category] = keys
+        category_order[category] = tuple(keys)
         for k in keys:
             key_to_category[k] = category
     return key_to_category, category_order
 
 
+def _build_boss_prize_template_keys(
+    section_order: Mapping[str, tuple[str, ...]],
+) -> dict[str, Mapping[str, str]]:
+    """Return input dungeon -> {"Boss"/"Prize": template key}."""
+    boss_prize_template_key: dict[str, Mapping[str, str]] = {}
+    for input_dungeon, output_dungeon in INPUT_DUNGEON_TO_OUTPUT.items():
+        bp = {}
+        for k in section_order.get(output_dungeon, ()):
+            if k.endswith(" - Boss"):
+                bp["Boss"] = k
+            elif k.endswith(" - Prize"):
+                bp["Prize"] = k
+        boss_prize_template_key[input_dungeon] = MappingProxyType(bp)
+    return boss_prize_template_key
+
+
+@dataclass(frozen=True)
+class TemplateIndex:
+    """Precompiled, read-only view of data/spoiler_orders.json.
+
+    Shared by every transform in the process, so nothing here may be mutated.
+    """
+
+    mtime_ns: int
+    key_to_section: Mapping[str, str]
+    section_order: Mapping[str, tuple[str, ...]]
+    section_members: Mapping[str, frozenset[str]]
+    key_to_category: Mapping[str, str]
+    category_order: Mapping[str, tuple[str, ...]]
+    category_members: Mapping[str, frozenset[str]]
+    boss_prize_template_key: Mapping[str, Mapping[str, str]]
+
+
+def _compile_template_index(templates: dict, mtime_ns: int) -> TemplateIndex:
+    key_to_section, section_order = _build_template_index(templates)
+    key_to_category, category_order = _build_entrance_template_index(templates)
+    return TemplateIndex(
+        mtime_ns=mtime_ns,
+        key_to_section=MappingProxyType(key_to_section),
+        section_order=MappingProxyType(section_order),
+        section_members=MappingProxyType(
+            {s: frozenset(keys) for s, keys in section_order.items()}
+        ),
+        key_to_category=MappingProxyType(key_to_category),
+        category_order=MappingProxyType(category_order),
+        category_members=MappingProxyType(
+            {c: frozenset(keys) for c, keys in category_order.items()}
+        ),
+        boss_prize_template_key=MappingProxyType(
+            _build_boss_prize_template_keys(section_order)
+        ),
+    )
+
+
+_template_index: TemplateIndex | None = None
+_template_index_lock = threading.Lock()
+
+
+def get_template_index() -> TemplateIndex:
+    """Return the process-wide template index, reloading it if the file changed."""
+    global _template_index
+    mtime_ns = _TEMPLATES_PATH.stat().st_mtime_ns
+    index = _template_index
+    if index is not None and index.mtime_ns == mtime_ns:
+        return index
+    with _template_index_lock:
+        if _template_index is None or _template_index.mtime_ns != mtime_ns:
+            _template_index = _compile_template_index(_load_templates(), mtime_ns)
+        return _template_index
+
+
 def _lookup_prize_in_input(section: dict, input_dungeon: str) -> Any:
     """Find a "<Dungeon> - Prize" value tolerating apostrophe/space variants."""
     if input_dungeon == "Thieves Town":
@@ -241,6 +387,21 @@ def _gather_input_locations(data: dict) -> Iterable[tuple[str, str]]:
             yield key, value
 
 
+def _build_dungeon_owner_index(data: dict) -> dict[str, str]:
+    """Return raw_key -> input dungeon name for every key in a dungeon section.
+
+    The first dungeon (in INPUT_DUNGEON_TO_OUTPUT order) containing a key owns it.
+    """
+    owners: dict[str, str] = {}
+    for dungeon in INPUT_DUNGEON_TO_OUTPUT.keys():
+        section = data.get(dungeon)
+        if not isinstance(section, dict):
+            continue
+        for key in section:
+            owners.setdefault(key, dungeon)
+    return owners
+
+
 def _classify_location(
     rename_key: str,
     key_to_section: dict[str, str],
@@ -254,8 +415,7 @@ def _classify_location(
 def _emit_locations(
     data: dict,
     bosses: dict[str, str],
-    key_to_section: dict[str, str],
-    section_order: dict[str, list[str]],
+    templates: TemplateIndex,
     followers_dest_set: set[str],
     boss_shuffle_active: bool,
 ) -> tuple[dict[str, "dict[str, Any]"], "dict[str, str]"]:
@@ -264,17 +424,13 @@ def _emit_locations(
         s: {} for s in ALL_LOCATION_OUTPUT_SECTIONS
     }
     followers: "dict[str, str]" = {}
+    # Keys missing from the shared template are ordered after it, per transform.
+    extra_order: dict[str, list[str]] = {s: [] for s in ALL_LOCATION_OUTPUT_SECTIONS}
+    extra_members: dict[str, set[str]] = {
+        s: set() for s in ALL_LOCATION_OUTPUT_SECTIONS
+    }
 
-    boss_prize_template_key: dict[str, dict[str, str]] = {}
-    for input_dungeon, output_dungeon in INPUT_DUNGEON_TO_OUTPUT.items():
-        keys = section_order.get(output_dungeon, [])
-        bp = {}
-        for k in keys:
-            if k.endswith(" - Boss"):
-                bp["Boss"] = k
-            elif k.endswith(" - Prize"):
-                bp["Prize"] = k
-        boss_prize_template_key[input_dungeon] = bp
+    dungeon_owners = _build_dungeon_owner_index(data)
 
     for raw_key, raw_value in _gather_input_locations(data):
         if raw_key in followers_dest_set:
@@ -288,10 +444,10 @@ def _emit_locations(
             continue
 
         # Boss / Prize rows -> emit into dungeon section using template key.
-        owner = _dungeon_owner(data, raw_key)
+        owner = dungeon_owners.get(raw_key)
         if owner and (raw_key.endswith(" - Boss") or raw_key.endswith(" - Prize")):
             row_kind = "Boss" if raw_key.endswith(" - Boss") else "Prize"
-            tmpl_key = boss_prize_template_key.get(owner, {}).get(row_kind)
+            tmpl_key = templates.boss_prize_template_key.get(owner, {}).get(row_kind)
             if tmpl_key is None:
                 continue
             output_dungeon = INPUT_DUNGEON_TO_OUTPUT[owner]
@@ -311,15 +467,19 @@ def _emit_locations(
 
         # Renames
         renamed = _apply_location_renames(raw_key)
-        section, base = _classify_location(renamed, key_to_section)
+        section, base = _classify_location(renamed, templates.key_to_section)
 
         if section is None:
-            section = INPUT_DUNGEON_TO_OUTPUT.get(_dungeon_owner(data, raw_key))
+            section = INPUT_DUNGEON_TO_OUTPUT.get(owner)
             if section is None:
                 continue
 
-        if base not in section_order.get(section, []):
-            section_order[section].append(base)
+        if (
+            base not in templates.section_members[section]
+            and base not in extra_members[section]
+        ):
+            extra_order[section].append(base)
+            extra_members[section].add(base)
 
         converted = _convert_item(raw_value)
         buckets[section].setdefault(base, []).append((renamed, converted))
@@ -328,7 +488,9 @@ def _emit_locations(
     output_sections: dict[str, "dict[str, Any]"] = {}
     for section in ALL_LOCATION_OUTPUT_SECTIONS:
         ordered: "dict[str, Any]" = {}
-        for base_key in section_order[section]:
+        for base_key in templates.section_order[section] + tuple(
+            extra_order[section]
+        ):
             entries = buckets[section].get(base_key)
             if not entries:
                 continue
@@ -338,15 +500,6 @@ def _emit_locations(
     return output_sections, followers
 
 
-def _dungeon_owner(data: dict, raw_key: str) -> str | None:
-    """Return the input dungeon name that contains raw_key, if any."""
-    for dungeon in INPUT_DUNGEON_TO_OUTPUT.keys():
-        section = data.get(dungeon, {})
-        if isinstance(section, dict) and raw_key in section:
-            return dungeon
-    return None
-
-
 def _emit_drops(data: dict) -> "dict[str, Any]" | None:
     drops_in = data.get("Drops")
     if not isinstance(drops_in, dict):
@@ -380,11 +533,14 @@ def _emit_prize_packs(data: dict) -> "dict[str, str]" | None:
 
 def _emit_entrances(
     data: dict,
-    key_to_category: dict[str, str],
-    category_order: dict[str, list[str]],
+    category_order: Mapping[str, tuple[str, ...]],
+    category_members: Mapping[str, frozenset[str]],
 ) -> "dict[str, dict[str, str]]":
     """Process Entrances array into the categorised dict shape."""
     raw_entries = data.get("Entrances", []) or []
+    if not raw_entries:
+        return {category: {} for category in category_order}
+
     pairs: list[tuple[str, str]] = []  # (output_key_with_suffix, entrance_value)
 
     for entry in raw_entries:
@@ -392,17 +548,11 @@ def _emit_entrances(
         ext = entry.get("exit", "")
         direction = entry.get("direction", "entrance")
 
-        if any(name in ent for name in ENTRANCE_LOCATIONS_EXCLUDE_LIST) or any(
-            name in ext for name in ENTRANCE_LOCATIONS_EXCLUDE_LIST
-        ):
+        if _ENTRANCE_EXCLUDE_RE.search(ent) or _ENTRANCE_EXCLUDE_RE.search(ext):
             continue
 
-        ent_renamed = ENTRANCE_NAME_REPLACEMENTS.get(
-            ent, ENTRANCE_AT_NAME_REPLACEMENTS.get(ent, ent)
-        )
-        ext_renamed = ENTRANCE_NAME_REPLACEMENTS.get(
-            ext, ENTRANCE_AT_NAME_REPLACEMENTS.get(ext, ext)
-        )
+        ent_renamed = _ENTRANCE_RENAMES.get(ent, ent)
+        ext_renamed = _ENTRANCE_RENAMES.get(ext, ext)
 
         if direction == "exit":
             # one-way reverse: the entrance side is the @-keyed location.
@@ -414,14 +564,13 @@ def _emit_entrances(
         pairs.append((key, value))
 
     out: "dict[str, dict[str, str]]" = {}
-    seen: set[str] = set()
     for category, ordered_keys in category_order.items():
+        members = category_members[category]
         cat_dict: "dict[str, str]" = {}
-        index = {k: v for k, v in pairs if k in ordered_keys}
+        index = {k: v for k, v in pairs if k in members}
         for k in ordered_keys:
             if k in index:
                 cat_dict[k] = index[k]
-                seen.add(k)
         out[category] = cat_dict
 
     return out
@@ -476,13 +625,12 @@ def _first_setting(meta_in: dict, key: str) -> Any:
     return val
 
 
-def transform(input_path: str | Path, output_path: str | Path) -> None:
-    with open(input_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+def transform_data(data: dict) -> "dict[str, Any]":
+    """Convert a parsed DR/OWR spoiler dict into the community format.
 
-    templates = _load_templates()
-    key_to_section, section_order = _build_template_index(templates)
-    key_to_category, category_order = _build_entrance_template_index(templates)
+    The input is not modified.
+    """
+    templates = get_template_index()
     bosses = data.get("Bosses", {}) or {}
     followers_dest_set = set(FOLLOWER_DESTINATION_MAP.keys())
 
@@ -505,8 +653,7 @@ def transform(input_path: str | Path, output_path: str | Path) -> None:
     location_sections, followers = _emit_locations(
         data,
         bosses,
-        key_to_section,
-        section_order,
+        templates,
         followers_dest_set,
         boss_shuffle_active,
     )
@@ -537,16 +684,222 @@ def transform(input_path: str | Path, output_path: str | Path) -> None:
         out["PrizePacks"] = prize_packs
 
     if entrance_shuffle_active:
-        out["Entrances"] = _emit_entrances(data, key_to_category, category_order)
+        out["Entrances"] = _emit_entrances(
+            data, templates.category_order, templates.category_members
+        )
     out["meta"] = _emit_meta(data)
+    return out
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(out, f, indent=4, ensure_ascii=False)
+
+def dumps(spoiler: "dict[str, Any]", compact: bool = False) -> bytes:
+    """Serialize a transformed spoiler to UTF-8 JSON bytes."""
+    if compact:
+        return json.dumps(
+            spoiler, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+    return json.dumps(spoiler, indent=4, ensure_ascii=False).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class OutputProfile:
+    """How a transformed spoiler is serialized: JSON style plus optional compression."""
+
+    compact: bool = False
+    encoding: str | None = None  # "gzip" or "zstd"
+
+    @classmethod
+    def parse(cls, value: str | None) -> OutputProfile:
+        """Parse "pretty", "compact", "compact+gzip", "pretty+zstd", ..."""
+        if not value:
+            return cls()
+        style, _, encoding = value.lower().partition("+")
+        if style not in ("pretty", "compact") or encoding not in ("", "gzip", "zstd"):
+            raise ValueError(f"Unknown spoiler output profile: {value}")
+        return cls(compact=style == "compact", encoding=encoding or None)
+
+
+def encode(
+    spoiler: "dict[str, Any]", profile: OutputProfile = OutputProfile()
+) -> tuple[bytes, str | None]:
+    """Serialize and compress a spoiler. Returns (body, Content-Encoding)."""
+    data = dumps(spoiler, compact=profile.compact)
+    if profile.encoding == "zstd" and _zstd is not None:
+        return _zstd.compress(data, level=19), "zstd"
+    if profile.encoding in ("gzip", "zstd"):
+        # zstd falls back to gzip when no zstd module is available.
+        return gzip.compress(data, compresslevel=9, mtime=0), "gzip"
+    return data, None
+
+
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+
+def decode(body: bytes) -> "dict[str, Any]":
+    """Parse a spoiler serialized by encode, with any output profile."""
+    if body[:2] == b"\x1f\x8b":
+        body = gzip.decompress(body)
+    elif body[:4] == _ZSTD_MAGIC:
+        if _zstd is None:
+            raise ValueError(
+                "spoiler is zstd-compressed but no zstd module is available"
+            )
+        body = _zstd.decompress(body)
+    return json.loads(body)
+
+
+def transform(input_path: str | Path, output_path: str | Path) -> None:
+    with open(input_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    Path(output_path).write_bytes(dumps(transform_data(data)))
+
+
+@functools.cache
+def converter_version() -> str:
+    """Fingerprint of the converter code and tables; changes invalidate batch outputs."""
+    digest = hashlib.sha256()
+    for path in (
+        Path(__file__),
+        Path(__file__).parent / "data" / "spoiler_data.py",
+        _TEMPLATES_PATH,
+    ):
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+_BATCH_MANIFEST = ".spoiler_converter_manifest.json"
+
+
+def _init_batch_worker() -> None:
+    # Workers forked after the parent warmed the index share it; others build it once.
+    get_template_index()
+
+
+def _convert_batch_file(
+    job: tuple[str, str, str | None],
+) -> tuple[str, str, str | None]:
+    """Convert one file for the batch CLI. Returns (input, digest, error)."""
+    input_path, output_path, known_digest = job
+    try:
+        raw = Path(input_path).read_bytes()
+        digest = hashlib.sha256(converter_version().encode() + raw).hexdigest()
+        if digest == known_digest and Path(output_path).exists():
+            return input_path, digest, None
+        Path(output_path).write_bytes(dumps(transform_data(json.loads(raw))))
+        return input_path, digest, None
+    except Exception as e:
+        return input_path, "", f"{type(e).__name__}: {e}"
+
+
+def _collect_batch_inputs(source: str) -> list[tuple[Path, str]]:
+    """Return (input path, path relative to the inputs' common directory) pairs.
+
+    The relative path keys the manifest and places the output, so files with the
+    same name in different directories of a glob do not collide.
+    """
+    path = Path(source)
+    if path.is_dir():
+        inputs = sorted(path.glob("*.json"))
+    else:
+        inputs = sorted(Path(p) for p in glob.glob(source))
+    if not inputs:
+        return []
+    root = Path(os.path.commonpath([p.resolve().parent for p in inputs]))
+    return [(p, p.resolve().relative_to(root).as_posix()) for p in inputs]
+
+
+def transform_batch(
+    source: str,
+    output_dir: str | Path,
+    jobs: int | None = None,
+    force: bool = False,
+) -> tuple[int, int, list[tuple[str, str]]]:
+    """Convert every spoiler in a directory or glob into output_dir.
+
+    Outputs keep their path relative to the inputs' common directory. Files whose
+    input content and converter version match the manifest in
+    output_dir are skipped. Returns (converted, skipped, [(input, error)]).
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / _BATCH_MANIFEST
+    manifest: dict[str, str] = {}
+    if manifest_path.exists() and not force:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+
+    batch = []
+    keys = {}
+    for input_path, key in _collect_batch_inputs(source):
+        output_path = output_dir / key
+        if output_path.resolve() == input_path.resolve():
+            raise ValueError(f"refusing to overwrite input {input_path}")
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        keys[str(input_path)] = key
+        batch.append((str(input_path), str(output_path), manifest.get(key)))
+
+    # Imported here, multiprocessing is a noticeable part of this module's import time.
+    from concurrent.futures import ProcessPoolExecutor
+
+    get_template_index()
+    converted = skipped = 0
+    failures: list[tuple[str, str]] = []
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_batch_worker) as pool:
+        results = pool.map(_convert_batch_file, batch, chunksize=8)
+        for (_, _, known_digest), (input_path, digest, error) in zip(batch, results):
+            if error is not None:
+                failures.append((input_path, error))
+                manifest.pop(keys[input_path], None)
+                continue
+            if digest == known_digest:
+                skipped += 1
+            else:
+                converted += 1
+            manifest[keys[input_path]] = digest
+
+    manifest_path.write_text(json.dumps(manifest, indent=4), encoding="utf-8")
+    return converted, skipped, failures
+
+
+def _batch_cli(argv: list[str]) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        prog="spoiler_converter.py --batch",
+        description="Convert a directory or glob of spoilers in parallel.",
+    )
+    parser.add_argument("source", help="input directory, or a quoted glob")
+    parser.add_argument("output_dir")
+    parser.add_argument("-j", "--jobs", type=int, default=None)
+    parser.add_argument(
+        "--force", action="store_true", help="ignore the manifest and convert all"
+    )
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    converted, skipped, failures = transform_batch(
+        args.source, args.output_dir, jobs=args.jobs, force=args.force
+    )
+    elapsed = time.perf_counter() - start
+
+    total = converted + skipped + len(failures)
+    print(
+        f"{total} files in {elapsed:.2f}s ({total / elapsed if elapsed else 0:.1f} files/s): "
+        f"{converted} converted, {skipped} up to date, {len(failures)} failed"
+    )
+    for input_path, error in failures:
+        print(f"  FAILED {input_path}: {error}", file=sys.stderr)
+    return 1 if failures else 0
 
 
 def _cli(argv: list[str]) -> int:
+    if len(argv) > 1 and argv[1] == "--batch":
+        return _batch_cli(argv[2:])
     if len(argv) < 3:
         print("usage: transformer_v2.py <input.json> <output.json>", file=sys.stderr)
+        print(
+            "       transformer_v2.py --batch <input_dir|glob> <output_dir> [-j N] [--force]",
+            file=sys.stderr,
+        )
         return 2
     transform(argv[1], argv[2])
     print(f"wrote {argv[2]}")
@@ -0,0 +1,120 @@
+import datetime
+import math
+from dataclasses import dataclass
+from itertools import groupby
+
+import app_context as ac
+import models
+
+# How far back generation statistics look.
+STATS_WINDOW = datetime.timedelta(days=60)
+# Fewer successful generations than this are not enough to move the roll lead time.
+MIN_SAMPLES = 5
+
+# Seeds are rolled at least this long before the race, as they always have been.
+DEFAULT_ROLL_LEAD = datetime.timedelta(minutes=10)
+# Racers should have the seed at least this long before the start.
+SEED_PREP_TIME = datetime.timedelta(minutes=8)
+# Never roll earlier than this, the room has to be open first.
+MAX_ROLL_LEAD = datetime.timedelta(minutes=25)
+
+
+@dataclass
+class GenerationStats:
+    namespace: str | None
+    preset: str
+    generations: int
+    failures: int
+    failure_rate: float
+    # Wall-clock seconds for successful generations
+    p50: float | None
+    p90: float | None
+    p95: float | None
+    max: float | None
+    mean_attempts: float | None
+
+
+def mode_preset(slug: str) -> tuple[str | None, str]:
+    """Split a mode slug into the AVIANART namespace and preset."""
+    namespace = slug.split("/")[0] if "/" in slug else None
+    preset = slug.split("/")[1] if "/" in slug else slug
+    return namespace, preset
+
+
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def generation_stats(generations: list[models.SeedGeneration]) -> list[GenerationStats]:
+    """Summarise generation records per namespace/preset, slowest p95 first."""
+
+    def key(generation):
+        return generation.namespace or "", generation.preset
+
+    stats = []
+    for (namespace, preset), group in groupby(sorted(generations, key=key), key=key):
+        group = list(group)
+        times = sorted(g.wallTime for g in group if g.outcome == "success")
+        attempts = [g.attempts for g in group if g.attempts is not None]
+        failures = len(group) - len(times)
+        stats.append(
+            GenerationStats(
+                namespace=namespace or None,
+                preset=preset,
+                generations=len(group),
+                failures=failures,
+                failure_rate=failures / len(group),
+                p50=percentile(times, 50),
+                p90=percentile(times, 90),
+                p95=percentile(times, 95),
+                max=times[-1] if times else None,
+                mean_attempts=sum(attempts) / len(attempts) if attempts else None,
+            )
+        )
+    stats.sort(key=lambda s: s.p95 or 0, reverse=True)
+    return stats
+
+
+def get_generation_stats(
+    namespace: str = None, preset: str = None, window: datetime.timedelta = STATS_WINDOW
+) -> list[GenerationStats]:
+    since = datetime.datetime.now(datetime.UTC).replace(tzinfo=None) - window
+    return generation_stats(
+        ac.database_service.get_seed_generations(
+            since=since, namespace=namespace, preset=preset
+        )
+    )
+
+
+def roll_lead_time(mode: models.Mode, open_mins_before_start: int = 30) -> datetime.timedelta:
+    """
+    How long before the race to roll the seed for a mode: enough for the preset's p95
+    generation time plus SEED_PREP_TIME, never less than DEFAULT_ROLL_LEAD. Grabbag
+    races use the slowest of the grabbag modes, as any of them can be picked.
+    """
+    if mode.slug == "ladder/grabbag":
+        slugs = [m.slug for m in ac.database_service.get_grabbag_enabled_modes()]
+    else:
+        slugs = [mode.slug]
+
+    presets = {
+        (namespace or "", preset.lower()) for namespace, preset in map(mode_preset, slugs)
+    }
+    slowest = 0.0
+    for stats in get_generation_stats():
+        if (stats.namespace or "", stats.preset) not in presets:
+            continue
+        if stats.generations - stats.failures >= MIN_SAMPLES:
+            slowest = max(slowest, stats.p95)
+
+    lead = max(DEFAULT_ROLL_LEAD, SEED_PREP_TIME + datetime.timedelta(seconds=slowest))
+    # Whole minutes, and leave the room a couple of minutes to open first
+    lead = datetime.timedelta(minutes=math.ceil(lead.total_seconds() / 60))
+    return max(
+        DEFAULT_ROLL_LEAD,
+        min(lead, MAX_ROLL_LEAD, datetime.timedelta(minutes=open_mins_before_start - 2)),
+    )
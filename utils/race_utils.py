@@ -1,4 +1,4 @@
-import asyncio
+import math
 import random
 from typing import TYPE_CHECKING
 import zoneinfo
@@ -10,11 +10,13 @@ import logging
 
 import hikari
 
-from services.avianart import AvianResponsePayload
+from services.avianart import AvianartGenPayload, AvianResponsePayload
 import app_context as ac
+import schemas
 from config import import_config
 from utils.grabbag_utils import get_grabbag_mode_weights, select_grabbag_mode_from_weights
-from utils.spoiler_utils import avianart_payload_to_spoiler
+from utils.generation_utils import mode_preset
+from utils.spoiler_utils import avianart_payload_to_spoiler, prepare_spoiler
 
 if TYPE_CHECKING:
     from services.racetime import LadderRaceHandler
@@ -42,6 +44,15 @@ logger = logging.getLogger("pyladderchicken")
 utc = zoneinfo.ZoneInfo("UTC")
 est = zoneinfo.ZoneInfo("US/Eastern")
 
+# Seed generation is abandoned if it is still running this close to the race start,
+# before the earliest force start (ladder races start 2 minutes early).
+SEED_DEADLINE_BEFORE_START = datetime.timedelta(minutes=2)
+# Seconds race actions wait for the bot to be handling the race room.
+HANDLER_TIMEOUT = 60
+# Seeds generated by pre_roll_seed, by scheduled race ID. After a restart the seed is
+# fetched again using the hash stored in the preRolledSeeds table.
+_pre_rolled_seeds: dict[int, AvianartGenPayload] = {}
+
 random_post_race_messages = [
     "LOL PED SEED",
     "Nice flute.",
@@ -114,6 +125,91 @@ async def open_race_room(race_id: int):
     return room_name
 
 
+async def pre_roll_seed(race_id: int, roll_lead_minutes: int = 10):
+    """
+    Generates the seed for a scheduled race ahead of roll_seed, keeping the hash private
+    until roll_seed reveals it. Grabbag races are skipped since their mode is picked at
+    roll time. Failures are only logged, roll_seed then generates the seed live.
+    """
+    if ac.database_service.get_setting("pre_roll_seeds") is False:
+        return
+
+    sched_race = ac.database_service.get_scheduled_race_by_id(race_id)
+    mode = sched_race.mode_obj
+    if mode.slug == 'ladder/grabbag':
+        return
+
+    existing = ac.database_service.get_pre_rolled_seed(race_id)
+    if existing and existing.modeId == mode.id:
+        logger.info(f"Race {race_id} already has a pre-rolled seed.")
+        return
+
+    race_utc_datetime = sched_race.time.replace(tzinfo=est).astimezone(utc)
+    namespace, preset = mode_preset(mode.slug)
+    try:
+        seed_info = await ac.avianart_service.generate_seed(
+            preset,
+            True,
+            namespace=namespace,
+            spoiler=True if mode.archetype_obj.spoiler else False,
+            # Give up a minute before roll_seed runs, it then rolls live
+            deadline=race_utc_datetime - datetime.timedelta(minutes=roll_lead_minutes + 1),
+            notify=False,
+        )
+    except Exception as e:
+        logger.warning(f"Pre-roll for race {race_id} failed, the seed will be rolled live: {e}")
+        return
+
+    if not seed_info:
+        logger.warning(f"Pre-roll for race {race_id} failed, the seed will be rolled live.")
+        return
+
+    _pre_rolled_seeds[race_id] = seed_info
+    ac.database_service.add_pre_rolled_seed(
+        schemas.PreRolledSeedWrite(
+            scheduledRaceId=race_id,
+            modeId=mode.id,
+            seed=seed_info.response.hash,
+            created=datetime.datetime.now(utc).replace(tzinfo=None),
+        )
+    )
+    logger.info(f"Pre-rolled seed {seed_info.response.hash} for race {race_id}.")
+
+    # Converting now leaves only the upload for roll_seed. The spoiler is indexed by
+    # roll_seed once the seed is actually used, a discarded pre-roll never is.
+    if mode.archetype_obj.spoiler:
+        try:
+            await prepare_spoiler(seed_info)
+        except Exception as e:
+            logger.error(f"Failed to prepare spoiler for pre-rolled race {race_id}: {e}")
+
+
+async def claim_pre_rolled_seed(sched_race) -> AvianartGenPayload | None:
+    """
+    Returns the pre-rolled seed for a scheduled race and marks it as used, or None if
+    there is no usable one.
+    """
+    seed_info = _pre_rolled_seeds.pop(sched_race.id, None)
+    pre_rolled = ac.database_service.get_pre_rolled_seed(sched_race.id)
+    if not pre_rolled or pre_rolled.modeId != sched_race.mode_obj.id:
+        return None
+
+    if seed_info is None or seed_info.response.hash != pre_rolled.seed:
+        try:
+            seed_info = await ac.avianart_service.fetch_permalink(pre_rolled.seed)
+        except Exception as e:
+            logger.error(f"Could not fetch pre-rolled seed {pre_rolled.seed} for race {sched_race.id}: {e}")
+            return None
+        if not seed_info.response.has_patch:
+            logger.error(f"Pre-rolled seed {pre_rolled.seed} for race {sched_race.id} is not finished.")
+            return None
+
+    ac.database_service.claim_pre_rolled_seed(
+        sched_race.id, datetime.datetime.now(utc).replace(tzinfo=None)
+    )
+    return seed_info
+
+
 async def roll_seed(race_id: int):
     """
     Rolls a seed for the given slug and namespace.
@@ -140,81 +236,61 @@ async def roll_seed(race_id: int):
     else:
         race = ac.database_service.set_rolled_race_mode(sched_race.raceId, sched_race.mode_obj.id)
 
-    namespace = race.rolledMode.slug.split("/")[0] if "/" in race.rolledMode.slug else None
-    slug = (
-        race.rolledMode.slug.split("/")[1]
-        if "/" in race.rolledMode.slug
-        else race.rolledMode.slug
-    )
+    namespace, slug = mode_preset(race.rolledMode.slug)
 
     room_name = race.raceRoom.lstrip("/")
-    
-    seed_info = await ac.avianart_service.generate_seed(
-        slug,
-        True,
-        namespace=namespace,
-        spoiler=True if race.rolledMode.archetype_obj.spoiler else False,
-        mystery=True if sched_race.mode_obj.slug == 'ladder/grabbag' else False,
-    )
+    race_utc_datetime = sched_race.time.replace(tzinfo=est).astimezone(utc)
+
+    seed_info = None
+    if sched_race.mode_obj.slug != 'ladder/grabbag':
+        seed_info = await claim_pre_rolled_seed(sched_race)
+        if seed_info:
+            logger.info(f"Using pre-rolled seed {seed_info.response.hash} for race {race_id}.")
+
+    if not seed_info:
+        seed_info = await ac.avianart_service.generate_seed(
+            slug,
+            True,
+            namespace=namespace,
+            spoiler=True if race.rolledMode.archetype_obj.spoiler else False,
+            mystery=True if sched_race.mode_obj.slug == 'ladder/grabbag' else False,
+            deadline=race_utc_datetime - SEED_DEADLINE_BEFORE_START,
+        )
+
+    if not seed_info:
+        # generate_seed has already alerted the admins
+        logger.error(f"No seed was generated for race {race_id}.")
+        return
 
     if race.rolledMode.archetype_obj.spoiler:
-        spoiler_name = avianart_payload_to_spoiler(seed_info, upload=True, race_id=race.id)
+        spoiler_name = await avianart_payload_to_spoiler(
+            seed_info,
+            upload=True,
+            race_id=race.id,
+            season=sched_race.season,
+            revealed_at=race_utc_datetime.timestamp(),
+        )
         if spoiler_name:
             await ac.discord_service.send_message(
                 content=f"Spoiler for seed {seed_info.response.hash} uploaded successfully: {config['s3_public_bucket_url']}/{spoiler_name}",
                 suppress_embeds=True,
             )
-            race_utc_datetime = sched_race.time.replace(tzinfo=est).astimezone(utc)
-            # Schedule spoiler to be posted at the same time as the seed starts
-            ac.scheduler_service.scheduler.add_job(
-                post_spoiler,
-                trigger=DateTrigger(run_date=race_utc_datetime),
-                args=[race_id],
-                id=f"post_spoiler_{race_id}",
-            )
-
-            for minutes in [10, 5, 3, 2, 1, 0]:
-                ac.scheduler_service.scheduler.add_job(
-                    post_prep_time_left,
-                    trigger=DateTrigger(
-                        run_date=race_utc_datetime
-                        + datetime.timedelta(minutes=15)
-                        - datetime.timedelta(minutes=minutes)
-                    ),
-                    kwargs={"race_id": race_id, "remaining_time_minutes": minutes},
-                    id=f"prep_time_left_{race_id}_{minutes}m",
-                )
-
-            for seconds in [30, 15, 10, 5, 4, 3, 2, 1]:
-                ac.scheduler_service.scheduler.add_job(
-                    post_prep_time_left,
-                    trigger=DateTrigger(
-                        run_date=race_utc_datetime
-                        + datetime.timedelta(minutes=15)
-                        - datetime.timedelta(seconds=seconds)
-                    ),
-                    kwargs={"race_id": race_id, "remaining_time_seconds": seconds},
-                    id=f"prep_time_left_{race_id}_{seconds}s",
-                )
+            schedule_spoiler_jobs(race_id, race_utc_datetime)
 
         else:
             admin_role = ac.database_service.get_setting("admin_role_id")
             admin_ping = f"<@&{admin_role}> " if admin_role else ""
+            if ac.spoiler_upload_queue is not None and ac.spoiler_upload_queue.has_pending(race.id):
+                content = f"{admin_ping}Failed to upload spoiler file for race {race_id} with seed ID {seed_info.response.hash}, it has been queued for retry and will be posted once uploaded."
+            else:
+                content = f"{admin_ping}Failed to upload spoiler file for race {race_id} with seed ID {seed_info.response.hash}!"
             await ac.discord_service.send_message(
-                content=f"{admin_ping}Failed to upload spoiler file for race {race_id} with seed ID {seed_info.response.hash}!",
+                content=content,
                 force_mention=True,
             )
 
-    retry_count = 0
-    while retry_count < 10:
-        if room_name not in ac.racetime_service.handlers:
-            logger.error(f"Room {room_name} not found in handlers, retrying...")
-            await asyncio.sleep(5)
-            retry_count += 1
-            continue
-        break
-    race_handler: LadderRaceHandler = ac.racetime_service.handler_objects.get(
-        room_name, None
+    race_handler: LadderRaceHandler = await ac.racetime_service.wait_for_handler(
+        room_name, timeout=HANDLER_TIMEOUT
     )
 
     if race_handler:
@@ -250,6 +326,10 @@ async def roll_seed(race_id: int):
 
     # TODO: Supress embeds
 
+    if not race_handler:
+        # Already logged above, without a handler there are no entrants to check
+        return
+
     racers = race_handler.data.get("entrants", [])
     savior_message = None
     if (not sched_race.mode_obj.archetype_obj.ladder and len(racers) == 1) or (
@@ -284,18 +364,12 @@ async def ping_unready(race_id: int):
         return
 
     room_name = ac.database_service.get_race_by_id(sched_race.raceId).raceRoom.lstrip("/")
-    retry_count = 0
-    while retry_count < 10:
-        if room_name not in ac.racetime_service.handlers:
-            logger.error(f"Room {room_name} not found in handlers, retrying...")
-            await asyncio.sleep(5)
-            retry_count += 1
-            continue
-        break
-
-    race_handler: LadderRaceHandler = ac.racetime_service.handler_objects.get(
-        room_name, None
+    race_handler: LadderRaceHandler = await ac.racetime_service.wait_for_handler(
+        room_name, timeout=HANDLER_TIMEOUT
     )
+    if not race_handler:
+        logger.error(f"Cannot ping unready! No handler found for room: {room_name}")
+        return
 
     await race_handler.send_message(
         "@unready Race starting in less than a minute! Ready up or you will be removed!"
@@ -316,18 +390,14 @@ async def warn_partitioned_race(race_id: int):
         return
 
     room_name = ac.database_service.get_race_by_id(sched_race.raceId).raceRoom.lstrip("/")
-    retry_count = 0
-    while retry_count < 10:
-        if room_name not in ac.racetime_service.handlers:
-            logger.error(f"Room {room_name} not found in handlers, retrying...")
-            await asyncio.sleep(5)
-            retry_count += 1
-            continue
-        break
-
-    race_handler: LadderRaceHandler = ac.racetime_service.handler_objects.get(
-        room_name, None
+    race_handler: LadderRaceHandler = await ac.racetime_service.wait_for_handler(
+        room_name, timeout=HANDLER_TIMEOUT
     )
+    if not race_handler:
+        logger.error(
+            f"Cannot warn partitioned race! No handler found for room: {room_name}"
+        )
+        return
 
     await race_handler.send_message(
         "@entrants Race is about to be partitioned! You will have ~2 minutes to ready up in the partitioned room or you will be disqualified!"
@@ -362,18 +432,18 @@ async def force_start_race(
             room_name
         ).parentRace.scheduledRace
 
-    retry_count = 0
-    while retry_count < 10:
-        if room_name not in ac.racetime_service.handlers:
-            logger.error(f"Room {room_name} not found in handlers, retrying...")
-            await asyncio.sleep(5)
-            retry_count += 1
-            continue
-        break
-
-    race_handler: LadderRaceHandler = ac.racetime_service.handler_objects.get(
-        room_name, None
+    race_handler: LadderRaceHandler = await ac.racetime_service.wait_for_handler(
+        room_name, timeout=HANDLER_TIMEOUT
     )
+    if not race_handler:
+        logger.error(f"Cannot force start race! No handler found for room: {room_name}")
+        admin_role = ac.database_service.get_setting("admin_role_id")
+        admin_ping = f"<@&{admin_role}> " if admin_role else ""
+        await ac.discord_service.send_message(
+            content=f"{admin_ping}Could not force start {ac.racetime_service.get_raceroom_url(room_name)}, the bot is not connected to the room!",
+            force_mention=True,
+        )
+        return
 
     ready = 0
     for entrant in race_handler.data.get("entrants", []):
@@ -477,6 +547,100 @@ async def post_prep_time_left(
         await race_handler.send_message(f"{remaining_time_seconds} seconds remain!")
 
 
+def schedule_spoiler_jobs(race_id: int, race_utc_datetime: datetime.datetime):
+    """
+    Schedule posting the spoiler at race start and the prep time countdown after it.
+    If the race has already started (the spoiler was uploaded late), the spoiler is
+    posted now with whatever prep time is left, and past countdown messages are skipped.
+    """
+    now = datetime.datetime.now(utc)
+    prep_end = race_utc_datetime + datetime.timedelta(minutes=15)
+
+    if race_utc_datetime > now:
+        # Schedule spoiler to be posted at the same time as the seed starts
+        ac.scheduler_service.scheduler.add_job(
+            post_spoiler,
+            trigger=DateTrigger(run_date=race_utc_datetime),
+            args=[race_id],
+            id=f"post_spoiler_{race_id}",
+            replace_existing=True,
+        )
+    else:
+        remaining_minutes = max(0, math.ceil((prep_end - now).total_seconds() / 60))
+        ac.scheduler_service.scheduler.add_job(
+            post_spoiler,
+            trigger=DateTrigger(run_date=now),
+            kwargs={"race_id": race_id, "prep_time_minutes": remaining_minutes},
+            id=f"post_spoiler_{race_id}",
+            replace_existing=True,
+        )
+
+    for minutes in [10, 5, 3, 2, 1, 0]:
+        run_date = prep_end - datetime.timedelta(minutes=minutes)
+        if run_date <= now:
+            continue
+        ac.scheduler_service.scheduler.add_job(
+            post_prep_time_left,
+            trigger=DateTrigger(run_date=run_date),
+            kwargs={"race_id": race_id, "remaining_time_minutes": minutes},
+            id=f"prep_time_left_{race_id}_{minutes}m",
+            replace_existing=True,
+        )
+
+    for seconds in [30, 15, 10, 5, 4, 3, 2, 1]:
+        run_date = prep_end - datetime.timedelta(seconds=seconds)
+        if run_date <= now:
+            continue
+        ac.scheduler_service.scheduler.add_job(
+            post_prep_time_left,
+            trigger=DateTrigger(run_date=run_date),
+            kwargs={"race_id": race_id, "remaining_time_seconds": seconds},
+            id=f"prep_time_left_{race_id}_{seconds}s",
+            replace_existing=True,
+        )
+
+
+async def spoiler_upload_completed(upload):
+    """
+    Called by the spoiler upload queue once a queued upload finally succeeds. Records the
+    spoiler URL on the race and schedules it to be posted if the race is still on.
+    """
+    if not upload.raceId:
+        return
+
+    spoiler_url = f"{config['s3_public_bucket_url']}/{upload.objectName}"
+    race = ac.database_service.add_spoiler_to_race(upload.raceId, spoiler_url)
+    race = ac.database_service.get_race_by_id(upload.raceId) if race else None
+    if not race or not race.scheduledRace:
+        logger.error(f"Uploaded queued spoiler {upload.objectName}, but race {upload.raceId} was not found.")
+        return
+
+    sched_race = race.scheduledRace
+    await ac.discord_service.send_message(
+        content=f"Queued spoiler for race {sched_race.id} uploaded successfully: {spoiler_url}",
+        suppress_embeds=True,
+    )
+    race_utc_datetime = sched_race.time.replace(tzinfo=est).astimezone(utc)
+    # Past the racetime time limit the room is closed, there is nowhere to post it.
+    if datetime.datetime.now(utc) > race_utc_datetime + datetime.timedelta(
+        hours=ladder_kwargs["time_limit"]
+    ):
+        return
+
+    # Nor when the race was cancelled (e.g. too few entrants) or the room is gone
+    room_name = race.raceRoom.lstrip("/")
+    race_handler: LadderRaceHandler = await ac.racetime_service.wait_for_handler(
+        room_name, timeout=HANDLER_TIMEOUT
+    )
+    status = race_handler.data.get("status", {}).get("value") if race_handler else None
+    if race_handler is None or status == "cancelled":
+        logger.info(
+            f"Not scheduling the spoiler post for race {sched_race.id}, room {room_name} is {status or 'gone'}."
+        )
+        return
+    schedule_spoiler_jobs(sched_race.id, race_utc_datetime)
+
+
 async def post_spoiler(
     race_id: int = None, prep_time_minutes: int = 15
 ):
@@ -1,7 +1,12 @@
-import json
+import asyncio
+import bisect
+import functools
 import logging
-import os
 import tempfile
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import ModuleType
 
 import app_context as ac
 from config import import_config
@@ -9,11 +14,31 @@ from config import import_config
 from pathlib import Path
 
 from services.avianart import AvianResponsePayload
-import spoiler_converter
 
 
 logger = logging.getLogger("pyladderchicken")
-config = import_config()
+
+
+@functools.cache
+def _config() -> dict:
+    return import_config()
+
+
+def converter() -> ModuleType:
+    """
+    The spoiler converter module, imported on first use. It pulls in the spoiler data
+    tables, which only spoiler races need, so it is kept out of bot startup.
+    """
+    import spoiler_converter
+
+    return spoiler_converter
+
+
+def prewarm() -> None:
+    """Import the converter and build its template index ahead of the first spoiler race."""
+    start = time.perf_counter()
+    converter().get_template_index()
+    logger.info(f"Spoiler converter warmed up in {(time.perf_counter() - start) * 1000:.0f} ms.")
 
 possible_prizes = {
     "Small Heart": 0xD8,
@@ -61,7 +86,93 @@ def get_prize_pack_name(prize_pack_set):
         return "ArrowsPack"
 
 
+# (spoiler path, ROM address, decoder) for single bytes copied from the patch.
+PATCH_FIELDS = [
+    (("Special", "DiggingGameDigs"), 0x180020, None),
+    (("Drops", "PullTree", "Tier1"), 0xEFBD4, possible_mem_locs_to_prizes),
+    (("Drops", "PullTree", "Tier2"), 0xEFBD5, possible_mem_locs_to_prizes),
+    (("Drops", "PullTree", "Tier3"), 0xEFBD6, possible_mem_locs_to_prizes),
+    (("Drops", "RupeeCrab", "Main"), 0x329C8, possible_mem_locs_to_prizes),
+    (("Drops", "RupeeCrab", "Final"), 0x329C4, possible_mem_locs_to_prizes),
+    (("Drops", "Stun"), 0x37993, possible_mem_locs_to_prizes),
+    (("Drops", "FishSave"), 0xE82CC, possible_mem_locs_to_prizes),
+]
+
+# Spoiler object names contain the seed hash, so their content never changes.
+SPOILER_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+PRIZE_PACKS_ADDRESS = 0x37A78
+PRIZE_PACK_COUNT = 7
+PRIZE_PACK_SIZE = 8
+
+
+class PatchImage:
+    """
+    Read-only view of a jsonrom patch (``{"<start>": [byte, ...]}``).
+
+    Chunk starts are parsed and sorted once so reads are a bisect instead of a scan of
+    every chunk. Chunks are assumed not to overlap, which holds for randomizer patches.
+    """
+
+    def __init__(self, patch_data: dict):
+        chunks = sorted((int(start), values) for start, values in patch_data.items())
+        self._starts = [start for start, _ in chunks]
+        self._chunks = [values for _, values in chunks]
+
+    def byte(self, address: int | str) -> int | None:
+        """Return the patched byte at address, or None if the patch does not touch it."""
+        target = int(address, 16) if isinstance(address, str) else int(address)
+        i = bisect.bisect_right(self._starts, target) - 1
+        if i >= 0:
+            offset = target - self._starts[i]
+            if offset < len(self._chunks[i]):
+                return self._chunks[i][offset]
+        return None
+
+    def read(self, address: int, length: int) -> list[int | None]:
+        """Return length bytes starting at address; unpatched bytes are None."""
+        out: list[int | None] = []
+        target = address
+        end = address + length
+        i = max(bisect.bisect_right(self._starts, target) - 1, 0)
+        while target < end:
+            if i >= len(self._starts):
+                # Past the last chunk.
+                out.extend([None] * (end - target))
+                break
+            start = self._starts[i]
+            values = self._chunks[i]
+            if target < start:
+                # Gap before this chunk.
+                stop = min(end, start)
+                out.extend([None] * (stop - target))
+            elif target < start + len(values):
+                stop = min(end, start + len(values))
+                out.extend(values[target - start : stop - start])
+                i += 1
+            else:
+                # Already past this chunk, the gap is filled against the next one.
+                i += 1
+                continue
+            target = stop
+        return out
+
+    def read_many(self, addresses: list[int]) -> dict[int, int | None]:
+        """Read a batch of single bytes in one pass over the sorted chunks."""
+        out: dict[int, int | None] = {}
+        i = -1
+        for target in sorted(addresses):
+            while i + 1 < len(self._starts) and self._starts[i + 1] <= target:
+                i += 1
+            value = None
+            if i >= 0 and target - self._starts[i] < len(self._chunks[i]):
+                value = self._chunks[i][target - self._starts[i]]
+            out[target] = value
+        return out
+
+
 def find_jsonrom_byte(patch_data, address):
+    # A one-off lookup, a linear scan beats sorting every chunk into a PatchImage.
     target = int(address, 16) if isinstance(address, str) else int(address)
     for start_str, values in patch_data.items():
         start = int(start_str)
@@ -73,49 +184,24 @@ def find_jsonrom_byte(patch_data, address):
 def add_extra_info_to_spoiler(seed: AvianResponsePayload) -> dict:
     """Not everything is available in the spoiler yet, so we need to add some extra info by parsing the patch data."""
     spoiler = seed.response.spoiler.copy()
-    spoiler["Special"]["DiggingGameDigs"] = find_jsonrom_byte(
-        seed.response.patch, 0x180020
-    )
     spoiler["Drops"] = {}
-    spoiler["Drops"]["PullTree"] = {}
-    spoiler["Drops"]["PullTree"]["Tier1"] = possible_mem_locs_to_prizes[
-        find_jsonrom_byte(seed.response.patch, (0xEFBD4))
-    ]
-    spoiler["Drops"]["PullTree"]["Tier2"] = possible_mem_locs_to_prizes[
-        find_jsonrom_byte(seed.response.patch, (0xEFBD5))
-    ]
-    spoiler["Drops"]["PullTree"]["Tier3"] = possible_mem_locs_to_prizes[
-        find_jsonrom_byte(seed.response.patch, (0xEFBD6))
-    ]
+    spoiler["PrizePacks"] = {}
 
-    spoiler["Drops"]["RupeeCrab"] = {}
-    spoiler["Drops"]["RupeeCrab"]["Main"] = possible_mem_locs_to_prizes[
-        find_jsonrom_byte(seed.response.patch, 0x329C8)
-    ]
-    spoiler["Drops"]["RupeeCrab"]["Final"] = possible_mem_locs_to_prizes[
-        find_jsonrom_byte(seed.response.patch, 0x329C4)
-    ]
+    patch = PatchImage(seed.response.patch)
+    values = patch.read_many([address for _, address, _ in PATCH_FIELDS])
+    for path, address, decoder in PATCH_FIELDS:
+        target = spoiler
+        for key in path[:-1]:
+            target = target.setdefault(key, {})
+        value = values[address]
+        target[path[-1]] = decoder[value] if decoder is not None else value
 
-    spoiler["Drops"]["Stun"] = possible_mem_locs_to_prizes[
-        find_jsonrom_byte(seed.response.patch, 0x37993)
-    ]
-    spoiler["Drops"]["FishSave"] = possible_mem_locs_to_prizes[
-        find_jsonrom_byte(seed.response.patch, 0xE82CC)
+    prize_bytes = patch.read(PRIZE_PACKS_ADDRESS, PRIZE_PACK_COUNT * PRIZE_PACK_SIZE)
+    prize_vals = [
+        [possible_mem_locs_to_prizes[b] for b in prize_bytes[i : i + PRIZE_PACK_SIZE]]
+        for i in range(0, len(prize_bytes), PRIZE_PACK_SIZE)
     ]
 
-    spoiler["PrizePacks"] = {}
-
-    prize_vals = []
-    prizes_loc = 0x37A78
-    for i in range(7):
-        pack = []
-        for j in range(8):
-            prize = possible_mem_locs_to_prizes[
-                find_jsonrom_byte(seed.response.patch, prizes_loc + (i * 8 + j))
-            ]
-            pack.append(prize)
-        prize_vals.append(pack)
-
     for group_index, prize_pack_set in enumerate(prize_vals, 1):
         group_name = ENEMY_GROUP_NAMES.get(group_index, f"Group{group_index}")
         prize_pack_name = get_prize_pack_name(prize_pack_set)
@@ -129,44 +215,185 @@ def add_extra_info_to_spoiler(seed: AvianResponsePayload) -> dict:
     return spoiler
 
 
-def avianart_payload_to_spoiler(
-    seed: AvianResponsePayload, upload: bool = True, race_id: int | None = None
-) -> Path | None:
-    json_spoiler_tmp = tempfile.NamedTemporaryFile(
-        mode="w", suffix=".json", encoding="utf-8", delete=False
-    )
-    spoiler = add_extra_info_to_spoiler(seed)
+def spoiler_object_name(seed: AvianResponsePayload, spoiler: dict) -> str:
+    hash_str = "-".join(spoiler["meta"]["hash"].split(",")).replace(" ", "")
+    return f"Spoiler_StepLadder_{seed.response.hash}_{hash_str}.json"
+
+
+@dataclass
+class CachedSpoiler:
+    body: bytes
+    content_encoding: str | None
+    uploaded: bool = False
+    indexed: bool = False
+
+
+# Converted spoilers by object name, most recent last. Lets retries skip conversion.
+SPOILER_CACHE_SIZE = 32
+_spoiler_cache: OrderedDict[str, CachedSpoiler] = OrderedDict()
+
+
+def _remember_spoiler(spoiler_name: str, cached: CachedSpoiler) -> None:
+    _spoiler_cache[spoiler_name] = cached
+    _spoiler_cache.move_to_end(spoiler_name)
+    while len(_spoiler_cache) > SPOILER_CACHE_SIZE:
+        _spoiler_cache.popitem(last=False)
+
 
+def _record_spoiler_url(race_id: int | None, spoiler_name: str) -> None:
+    if race_id:
+        ac.database_service.add_spoiler_to_race(race_id, f"{_config()['s3_public_bucket_url']}/{spoiler_name}")
+
+
+def _index_spoiler(
+    seed: AvianResponsePayload,
+    transformed: dict,
+    race_id: int,
+    season: int | None,
+    revealed_at: float | None,
+) -> None:
+    if ac.spoiler_index_service is None:
+        return
     try:
-        json.dump(spoiler, json_spoiler_tmp)
-        json_spoiler_tmp.flush()
-        json_spoiler_tmp.close()
+        count = ac.spoiler_index_service.index_spoiler(
+            seed.response.hash,
+            transformed,
+            season=season,
+            race_id=race_id,
+            revealed_at=revealed_at,
+        )
+        logger.info(f"Indexed {count} placements for seed {seed.response.hash}.")
+    except Exception as e:
+        logger.error(f"Failed to index spoiler for seed {seed.response.hash}: {e}")
+
+
+def _convert_spoiler(
+    seed: AvianResponsePayload, profile_name: str | None
+) -> tuple[dict, CachedSpoiler]:
+    spoiler_converter = converter()
+    profile = spoiler_converter.OutputProfile.parse(profile_name)
+    transformed = spoiler_converter.transform_data(add_extra_info_to_spoiler(seed))
+    return transformed, CachedSpoiler(*spoiler_converter.encode(transformed, profile))
+
+
+def _index_cached_spoiler(
+    seed: AvianResponsePayload,
+    cached: CachedSpoiler,
+    race_id: int,
+    season: int | None,
+    revealed_at: float | None,
+) -> None:
+    transformed = converter().decode(cached.body)
+    _index_spoiler(seed, transformed, race_id, season, revealed_at)
 
-        transformed_output = (
-            Path(tempfile.gettempdir())
-            / f"Spoiler_StepLadder_{seed.response.hash}_{'-'.join(spoiler['meta']['hash'].split(',')).replace(' ', '')}.json"
+
+def _write_spoiler_to_tempdir(seed: AvianResponsePayload, spoiler_name: str) -> Path:
+    spoiler_converter = converter()
+    transformed = spoiler_converter.transform_data(add_extra_info_to_spoiler(seed))
+    transformed_output = Path(tempfile.gettempdir()) / spoiler_name
+    transformed_output.write_bytes(spoiler_converter.dumps(transformed))
+    return transformed_output
+
+
+async def _convert_and_index(
+    seed: AvianResponsePayload,
+    spoiler_name: str,
+    race_id: int | None,
+    season: int | None,
+    revealed_at: float | None,
+) -> CachedSpoiler:
+    transformed, cached = await asyncio.to_thread(
+        _convert_spoiler,
+        seed,
+        ac.database_service.get_setting("spoiler_output_profile"),
+    )
+    _remember_spoiler(spoiler_name, cached)
+    if race_id:
+        await asyncio.to_thread(
+            _index_spoiler, seed, transformed, race_id, season, revealed_at
         )
-        spoiler_converter.transform(json_spoiler_tmp.name, transformed_output)
-    finally:
-        try:
-            Path(json_spoiler_tmp.name).unlink(missing_ok=True)
-        except OSError:
-            pass
+        cached.indexed = True
+    return cached
+
+
+async def prepare_spoiler(seed: AvianResponsePayload) -> str:
+    """
+    Convert the spoiler for a pre-rolled seed without uploading or indexing it. The
+    seed may still be discarded; avianart_payload_to_spoiler reuses the cached
+    conversion and indexes it once the seed is used for a race.
+    """
+    spoiler_name = spoiler_object_name(seed, seed.response.spoiler)
+    if spoiler_name not in _spoiler_cache:
+        await _convert_and_index(seed, spoiler_name, None, None, None)
+    return spoiler_name
+
+
+async def avianart_payload_to_spoiler(
+    seed: AvianResponsePayload,
+    upload: bool = True,
+    race_id: int | None = None,
+    season: int | None = None,
+    revealed_at: float | None = None,
+) -> Path | str | None:
+    """
+    Convert and upload the spoiler for a generated seed. Race spoilers are also added to
+    the spoiler search index, hidden until revealed_at (a UNIX timestamp).
+
+    Conversion, indexing and the upload all run in worker threads so the event loop
+    keeps serving Discord and racetime while a spoiler is processed.
+    """
+    spoiler_name = spoiler_object_name(seed, seed.response.spoiler)
+
     if upload:
-        uploaded = ac.s3_service.upload_file(
-            str(transformed_output), transformed_output.name
+        cached = _spoiler_cache.get(spoiler_name)
+        if cached is not None:
+            _spoiler_cache.move_to_end(spoiler_name)
+            # Converted ahead of time by prepare_spoiler, index it now it is used
+            if race_id and not cached.indexed:
+                await asyncio.to_thread(
+                    _index_cached_spoiler, seed, cached, race_id, season, revealed_at
+                )
+                cached.indexed = True
+
+        # Object names are content-addressed, so an existing object is the same spoiler.
+        in_s3 = cached is not None and cached.uploaded
+        if not in_s3:
+            in_s3 = await ac.s3_service.get_object_etag(spoiler_name) is not None
+        if in_s3:
+            logger.info(f"Spoiler file {spoiler_name} already in S3, skipping upload.")
+            if cached is None and race_id:
+                # Uploaded before the cache was lost (e.g. a restart), still index it
+                cached = await _convert_and_index(seed, spoiler_name, race_id, season, revealed_at)
+                cached.uploaded = True
+            _record_spoiler_url(race_id, spoiler_name)
+            return spoiler_name
+
+        if cached is None:
+            cached = await _convert_and_index(seed, spoiler_name, race_id, season, revealed_at)
+
+        uploaded = await ac.s3_service.upload_bytes(
+            cached.body,
+            spoiler_name,
+            content_encoding=cached.content_encoding,
+            cache_control=SPOILER_CACHE_CONTROL,
         )
         if uploaded:
-            logger.info(
-                f"Spoiler file {transformed_output} uploaded successfully to S3."
-            )
-            if race_id:
-                ac.database_service.add_spoiler_to_race(race_id, f"{config['s3_public_bucket_url']}/{transformed_output.name}")
-            os.remove(transformed_output)
-            return transformed_output.name
+            cached.uploaded = True
+            logger.info(f"Spoiler file {spoiler_name} uploaded successfully to S3.")
+            _record_spoiler_url(race_id, spoiler_name)
+            return spoiler_name
         else:
-            logger.error(f"Failed to upload spoiler file {transformed_output} to S3.")
+            logger.error(f"Failed to upload spoiler file {spoiler_name} to S3.")
+            if race_id and ac.spoiler_upload_queue is not None:
+                await ac.spoiler_upload_queue.enqueue(
+                    spoiler_name,
+                    cached.body,
+                    content_encoding=cached.content_encoding,
+                    cache_control=SPOILER_CACHE_CONTROL,
+                    race_id=race_id,
+                )
             return None
 
+    transformed_output = await asyncio.to_thread(_write_spoiler_to_tempdir, seed, spoiler_name)
     logger.info(f"Transformed spoiler file saved to {transformed_output}")
     return transformed_output